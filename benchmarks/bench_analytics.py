@@ -0,0 +1,71 @@
+"""Shift analytics: local snapshot vs re-reading the Logs sheet.
+
+    python benchmarks/bench_analytics.py [rows] [new_rows]
+
+Seeds a fake ``Logs`` worksheet with ``rows`` pick lines, then times:
+the first pull into the snapshot, an incremental pull after ``new_rows``
+more lines are appended, a cold start (reload from the Parquet parts), and
+the dashboard report (``shift_report``). The baseline is what a dashboard load costs
+without a snapshot: ``get_all_values`` + DataFrame on every open.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking import analytics  # noqa: E402
+from picking.sheet_logs import LOG_HEADERS  # noqa: E402
+from fakes import FakeSpreadsheet  # noqa: E402
+
+
+def make_rows(n, start, rng, first_order=0):
+    rows = []; t = start; order = first_order
+    while len(rows) < n:
+        t += timedelta(seconds=rng.randint(30, 240)); picker = rng.randint(1, 12); order += 1
+        for i in range(rng.randint(1, 4)):
+            rows.append([t.strftime(analytics.TIMESTAMP_FORMAT), f"Picker {picker:02d}", f"O{order:07d}", f"885{rng.randint(0, 20000):010d}",
+                         "Product", f"{'ABCD'[rng.randint(0, 3)]}-{rng.randint(1, 30)}-{rng.randint(0, 4)}", str(rng.randint(1, 3)), "", "link"])
+    return rows[:n], t, order
+
+
+def timed(fn):
+    t0 = time.perf_counter(); out = fn(); return out, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(1)
+    rows, last_t, last_order = make_rows(n, datetime(2026, 10, 1, 8), rng)
+    sheet = FakeSpreadsheet(); ws = sheet.seed("Logs", [LOG_HEADERS] + rows)
+    print(f"parquet: {analytics.PARQUET} | {n} rows")
+
+    empty_scans = analytics.pd.DataFrame(columns=['ts', 'location', 'scanned', 'ok', 'picker', 'barcode'])
+
+    def dashboard(df):
+        return analytics.shift_report(df, None, empty_scans)
+
+    with tempfile.TemporaryDirectory() as root:
+        snap = analytics.LogSnapshot(root, lambda: [("Logs", lambda: ws, None)], LOG_HEADERS, min_interval=0)
+        got, ms = timed(snap.refresh); print(f"  first pull        {ms:8.1f} ms  ({got} rows)")
+        more, _, _ = make_rows(extra, last_t, rng, last_order); ws.append_rows(more)
+        got, ms = timed(snap.refresh); print(f"  incremental pull  {ms:8.1f} ms  ({got} rows)")
+        _, ms = timed(snap.frame); print(f"  typed frame       {ms:8.1f} ms  (once per pull)")
+        df = snap.frame()
+        _, ms = timed(lambda: dashboard(df)); print(f"  shift_report      {ms:8.1f} ms  (once per pull + date range; cached by generation)")
+        cache = {(snap.generation, 'today'): dashboard(df)}
+        _, ms = timed(lambda: cache[(snap.generation, 'today')]); print(f"  dashboard load    {ms:8.3f} ms  (cache hit, no sheet reads)")
+        cold = analytics.LogSnapshot(root, lambda: [], LOG_HEADERS)
+        _, ms = timed(cold.frame); print(f"  cold start        {ms:8.1f} ms  ({len(cold.raw())} rows from {len(cold._part_files())} parts)")
+
+    def baseline():
+        values = ws.get_all_values()
+        return dashboard(analytics.typed_logs(analytics.pd.DataFrame(values[1:], columns=values[0])))
+    _, ms = timed(baseline); print(f"  re-read sheet     {ms:8.1f} ms  (per dashboard load, + 1 sheet read)")
+
+
+if __name__ == "__main__":
+    main()
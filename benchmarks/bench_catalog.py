@@ -0,0 +1,70 @@
+"""Barcode lookup: DataFrame scan (+ st.cache_data copy) vs picking.catalog.Catalog.
+
+    python benchmarks/bench_catalog.py [n_skus] [n_lookups]
+"""
+import os
+import pickle
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking.catalog import Catalog  # noqa: E402
+
+
+def make_catalog_frame(n):
+    return pd.DataFrame({
+        'Barcode': [f"885{i:010d}" for i in range(n)],
+        'SKU': [f"SKU{i}" for i in range(n)],
+        'Category': [f"CAT{i % 40}" for i in range(n)],
+        'Brand': [f"Brand{i % 500}" for i in range(n)],
+        'Size': [f"{(i % 12) * 50}ml" for i in range(n)],
+        'Variant': [f"Variant {i}" for i in range(n)],
+        'Zone': [chr(65 + i % 8) for i in range(n)],
+        'Location': [f"{i % 30:02d}-{i % 5}" for i in range(n)],
+    })
+
+
+def bench(label, fn, barcodes):
+    t0 = time.perf_counter()
+    for b in barcodes: fn(b)
+    dt = time.perf_counter() - t0
+    print(f"{label:<38} {dt / len(barcodes) * 1e6:>12.1f} us/lookup")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    df = make_catalog_frame(n)
+    barcodes = [df['Barcode'].iat[random.randrange(n)] for _ in range(n_lookups)]
+    blob = pickle.dumps(df)
+
+    def old_path(b):
+        # st.cache_data คืน Copy ที่ Unpickle ใหม่ทุกครั้ง แล้วค่อย Scan
+        frame = pickle.loads(blob)
+        match = frame[frame['Barcode'] == b]
+        row = match.iloc[0]
+        return f"{row.iloc[3]} {row.iloc[5]}", f"{row.get('Zone', '')}-{row.get('Location', '')}"
+
+    def scan_only(b):
+        match = df[df['Barcode'] == b]
+        return match.iloc[0]
+
+    t0 = time.perf_counter()
+    catalog = Catalog.from_frame(df)
+    build = time.perf_counter() - t0
+
+    def new_path(b):
+        entry = catalog.lookup(b)
+        return Catalog.display_name(entry), Catalog.target_location(entry)
+
+    print(f"catalog: {n:,} SKUs, {n_lookups} lookups, index build {build * 1e3:.1f} ms (once per refresh)")
+    bench("DataFrame scan + cache_data copy", old_path, barcodes)
+    bench("DataFrame scan only", scan_only, barcodes)
+    bench("Catalog.lookup", new_path, barcodes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Barcode decode: raw ``decode(Image.open(...))`` vs picking.barcode.decode_scan.
+
+    python benchmarks/bench_decode.py [corpus_dir] [--field product]
+
+Without a corpus directory a set of synthetic 12 MP frames with an EAN-13
+label is generated. Needs libzbar (same as the app).
+"""
+import argparse
+import glob
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pyzbar.pyzbar import decode  # noqa: E402
+from picking.barcode import decode_scan  # noqa: E402
+
+_L = ["0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011"]
+_G = ["".join("1" if b == "0" else "0" for b in c)[::-1] for c in _L]
+_R = ["".join("1" if b == "0" else "0" for b in c) for c in _L]
+_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def ean13_digits(body12):
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body12))
+    return body12 + str((10 - total % 10) % 10)
+
+
+def ean13_modules(code):
+    first, left, right = int(code[0]), code[1:7], code[7:]
+    bits = "101"
+    for d, p in zip(left, _PARITY[first]): bits += (_L if p == "L" else _G)[int(d)]
+    bits += "01010"
+    for d in right: bits += _R[int(d)]
+    return bits + "101"
+
+
+def synth_frame(code, size=(4000, 3000), module_px=6):
+    img = Image.new("RGB", size, (random.randint(90, 160),) * 3)
+    bits = ean13_modules(code)
+    w = len(bits) * module_px; h = w // 2
+    label = Image.new("L", (w + 20 * module_px, h + 10 * module_px), 255)
+    d = ImageDraw.Draw(label)
+    for i, b in enumerate(bits):
+        if b == "1":
+            x = 10 * module_px + i * module_px
+            d.rectangle([x, 5 * module_px, x + module_px - 1, 5 * module_px + h], fill=0)
+    x0 = random.randint(0, size[0] - label.width); y0 = random.randint(0, size[1] - label.height)
+    img.paste(label.convert("RGB"), (x0, y0))
+    img = img.filter(ImageFilter.GaussianBlur(0.8))
+    buf = io.BytesIO(); img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def load_corpus(path, n):
+    if path:
+        files = sorted(glob.glob(os.path.join(path, "*.jp*g")) + glob.glob(os.path.join(path, "*.png")))
+        return [open(f, "rb").read() for f in files]
+    return [synth_frame(ean13_digits(f"885{random.randrange(10**9):09d}")) for _ in range(n)]
+
+
+def run(label, fn, corpus):
+    times = []; hits = 0
+    for data in corpus:
+        t0 = time.perf_counter(); text = fn(io.BytesIO(data)); times.append(time.perf_counter() - t0)
+        hits += bool(text)
+    print(f"{label:<28} median {statistics.median(times) * 1e3:8.1f} ms   max {max(times) * 1e3:8.1f} ms   hits {hits}/{len(corpus)}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("corpus", nargs="?")
+    ap.add_argument("--field", default="product")
+    ap.add_argument("-n", type=int, default=10)
+    args = ap.parse_args()
+    corpus = load_corpus(args.corpus, args.n)
+
+    def old(f):
+        res = decode(Image.open(f))
+        return res[0].data.decode("utf-8") if res else None
+
+    run("decode(Image.open(...))", old, corpus)
+    run(f"decode_scan(field={args.field})", lambda f: decode_scan(f, args.field).text, corpus)
+    run("decode_scan(field=None)", lambda f: decode_scan(f, None).text, corpus)
+
+
+if __name__ == "__main__":
+    main()
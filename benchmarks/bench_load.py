@@ -0,0 +1,254 @@
+"""Load test: N simulated pickers run the login -> pack -> rider flows of
+Amaze_app_MFC_Gmail.py through Streamlit's AppTest, against the in-process
+Sheets/Drive fakes in ``fakes.py`` (no Google account or network needed).
+
+    python benchmarks/bench_load.py [--pickers 4] [--orders 3] [--items 2] [--photos 2]
+                                    [--latency 0.05] [--error-rate 0.02] [--json out.json]
+
+Each picker is its own AppTest session on its own thread; the app's
+``st.cache_resource`` objects (clients, catalog, outbox worker) are shared
+between them exactly as between browser sessions. AppTest can only run
+one script at a time per process, so script runs are serialised through
+``RUN_LOCK``: per-flow latency is reported both as wall time (including
+waiting for other pickers' runs) and as the picker's own script time. The
+outbox worker and upload pool still run truly in parallel. The camera component is
+replaced by a stand-in that returns a JPEG when the bench "presses the
+shutter"; barcodes/IDs are typed into the manual inputs.
+
+Reports throughput, per-flow latency (what the picker waits for), how long
+the background outbox takes to sync everything, and API calls per order.
+Exits non-zero if rows/uploads are missing or outbox jobs failed.
+"""
+import argparse
+import io
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import streamlit as st  # noqa: E402
+import streamlit_back_camera_input as camera  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from picking import metrics, ratelimit  # noqa: E402
+from bench_catalog import make_catalog_frame  # noqa: E402
+from fakes import FakeBackend, Faults, jpeg_bytes  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Amaze_app_MFC_Gmail.py")
+PASSWORD = "1234"
+PACK_MODE = "📦 แผนกแพ็คสินค้า"
+RIDER_MODE = "🏍️ ส่งงาน Rider"
+PHOTO = None
+RUN_LOCK = threading.Lock()  # AppTest สร้าง/ลบ Runtime จำลองทุกครั้งที่รัน -> รันพร้อมกันหลาย Thread ไม่ได้
+
+
+# --- camera stand-in ---
+def fake_camera(label, key=None, **kwargs):
+    # เหมือน Component จริง: ถ่ายแล้วค่าค้างอยู่กับ key นั้นจนกว่า key จะเปลี่ยน (cam_counter)
+    # และคืน io.BytesIO ธรรมดา (ไม่มี .size / .file_id) ใหม่ทุก Rerun
+    shots = st.session_state.setdefault('_bench_shots', set())
+    shutter = st.session_state.get('_bench_shutter')
+    if shutter and key and key.startswith(shutter) and key not in shots:
+        shots.add(key); st.session_state['_bench_shutter'] = None
+    return io.BytesIO(PHOTO) if key in shots else None
+
+
+# --- one simulated picker ---
+class Picker:
+    def __init__(self, index, catalog, args):
+        self.index = index; self.user_id = f"U{index:03d}"; self.catalog = catalog; self.args = args
+        self.at = AppTest.from_file(APP, default_timeout=args.timeout)
+        self.timings = {'login': [], 'pack': [], 'rider': []}
+        self.script_time = {'login': [], 'pack': [], 'rider': []}
+        self.orders = []; self._busy = 0.0
+
+    def run(self, fn=None):
+        with RUN_LOCK:
+            t0 = time.perf_counter()
+            try: (fn or self.at.run)()
+            finally: self._busy += time.perf_counter() - t0
+        if self.at.exception: raise RuntimeError(f"{self.user_id}: {self.at.exception[0].message}")
+        return self.at
+
+    def click(self, label):
+        button = next((b for b in self.at.button if b.label == label), None)
+        if button is None: raise RuntimeError(f"{self.user_id}: no button {label!r} (have {[b.label for b in self.at.button]})")
+        return self.run(button.click().run)
+
+    def type(self, key, value): return self.run(self.at.text_input(key=key).set_value(value).run)
+
+    def shoot(self, prefix):
+        self.at.session_state['_bench_shutter'] = prefix
+        return self.run()
+
+    def _done(self, flow, t0):
+        self.timings[flow].append(time.perf_counter() - t0); self.script_time[flow].append(self._busy); self._busy = 0.0
+
+    def login(self):
+        t0 = time.perf_counter(); self._busy = 0.0
+        self.run()
+        self.type("input_user_manual", self.user_id)
+        self.type("login_pass_input", PASSWORD)
+        self.click("✅ ยืนยัน Login")
+        if self.at.session_state['current_user_id'] != self.user_id: raise RuntimeError(f"{self.user_id}: login failed")
+        self._done('login', t0)
+
+    def pack(self, n):
+        order_id = f"B{self.index:02d}{n:03d}"
+        t0 = time.perf_counter(); self._busy = 0.0
+        self.run(self.at.sidebar.radio[0].set_value(PACK_MODE).run)
+        self.type("pack_order_man", order_id)
+        for k in range(self.args.items):
+            barcode, location = self.catalog[(self.index * 7919 + n * 31 + k) % len(self.catalog)]
+            self.type("pack_prod_man", barcode)
+            self.type("loc_man", location)
+            self.click("➕ เพิ่มลงตะกร้า")
+        self.click("✅ ยืนยันรายการครบแล้ว (ไปถ่ายรูป)")
+        for _ in range(self.args.photos): self.shoot("pack_cam_fin_")
+        self.click("☁️ ยืนยัน Upload ทั้งหมด")
+        self._done('pack', t0)
+        self.orders.append(order_id)
+
+    def rider(self, order_id):
+        t0 = time.perf_counter(); self._busy = 0.0
+        self.run(self.at.sidebar.radio[0].set_value(RIDER_MODE).run)
+        self.type("rider_ord_man", order_id)
+        if not self.at.session_state['target_rider_folder_id']:
+            raise RuntimeError(f"{self.user_id}: rider folder for {order_id} not found")
+        self.shoot("rider_cam_act_")
+        self.click("🚀 ยืนยันส่งรูปนี้")
+        self._done('rider', t0)
+
+
+# --- helpers ---
+def outbox_counts(path):
+    if not os.path.exists(path): return {}
+    with sqlite3.connect(path) as db:
+        return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+def wait_outbox(path, timeout):
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        counts = outbox_counts(path)
+        if not counts.get('pending') and not counts.get('running'): return time.perf_counter() - t0, counts
+        time.sleep(0.05)
+    return None, outbox_counts(path)
+
+
+def pct(values, q):
+    if not values: return None
+    s = sorted(values); return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+def flow_stats(values):
+    if not values: return {'count': 0}
+    return {'count': len(values), 'mean': statistics.fmean(values), 'p50': pct(values, 0.5), 'p95': pct(values, 0.95),
+            'max': max(values)}
+
+
+def each(pickers, fn, workers):
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="picker") as pool:
+        for f in [pool.submit(fn, p) for p in pickers]: f.result()
+
+
+def main():
+    global PHOTO
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pickers", type=int, default=4)
+    ap.add_argument("--orders", type=int, default=3, help="orders per picker")
+    ap.add_argument("--items", type=int, default=2, help="basket lines per order")
+    ap.add_argument("--photos", type=int, default=2, help="pack photos per order")
+    ap.add_argument("--skus", type=int, default=20_000)
+    ap.add_argument("--latency", type=float, default=0.05, help="fake API latency (s)")
+    ap.add_argument("--jitter", type=float, default=0.02)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=429)
+    ap.add_argument("--quota-scale", type=float, default=1.0, help="multiply the per-minute API quotas")
+    ap.add_argument("--timeout", type=float, default=60.0, help="AppTest script-run timeout (s)")
+    ap.add_argument("--sync-timeout", type=float, default=120.0)
+    ap.add_argument("--json", help="also write the report here")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="picking_bench_")
+    outbox_path = os.path.join(workdir, "outbox.sqlite3")
+    os.environ['PICKING_OUTBOX_PATH'] = outbox_path
+    os.environ['PICKING_BLOB_DIR'] = os.path.join(workdir, "blobs")
+    for k in ratelimit.QUOTAS_PER_MINUTE: ratelimit.QUOTAS_PER_MINUTE[k] = int(ratelimit.QUOTAS_PER_MINUTE[k] * args.quota_scale)
+
+    frame = make_catalog_frame(args.skus)
+    catalog = list(zip(frame['Barcode'], frame['Zone'] + "-" + frame['Location']))
+    backend = FakeBackend(Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                 error_status=args.error_status, seed=1))
+    backend.seed_catalog(frame)
+    backend.seed_users([(f"U{i:03d}", PASSWORD, f"Picker {i}") for i in range(args.pickers)])
+    backend.install()
+    camera.back_camera_input = fake_camera
+    PHOTO = jpeg_bytes()
+
+    pickers = [Picker(i, catalog, args) for i in range(args.pickers)]
+    t_start = time.perf_counter()
+    each(pickers, Picker.login, args.pickers)
+    t_login = time.perf_counter()
+    each(pickers, lambda p: [p.pack(n) for n in range(args.orders)], args.pickers)
+    t_pack = time.perf_counter()
+    sync_pack, _ = wait_outbox(outbox_path, args.sync_timeout)
+    t_sync = time.perf_counter()
+    each(pickers, lambda p: [p.rider(o) for o in p.orders], args.pickers)
+    t_rider = time.perf_counter()
+    sync_rider, counts = wait_outbox(outbox_path, args.sync_timeout)
+
+    n_orders = args.pickers * args.orders
+    logs, rider_logs = backend.rows("Logs"), backend.rows("Rider_Logs")
+    uploads = len(backend.drive.uploads())
+    api = backend.api_calls()
+    problems = []
+    if logs != n_orders * args.items: problems.append(f"Logs rows {logs} != {n_orders * args.items}")
+    if rider_logs != n_orders: problems.append(f"Rider_Logs rows {rider_logs} != {n_orders}")
+    if uploads != n_orders * (args.photos + 1): problems.append(f"uploads {uploads} != {n_orders * (args.photos + 1)}")
+    if counts.get('failed'): problems.append(f"{counts['failed']} outbox jobs failed")
+
+    spans = metrics.RECORDER.summary()
+    report = {
+        'config': vars(args),
+        'flows': {k: flow_stats([t for p in pickers for t in p.timings[k]]) for k in ('login', 'pack', 'rider')},
+        'script_time': {k: flow_stats([t for p in pickers for t in p.script_time[k]]) for k in ('login', 'pack', 'rider')},
+        'throughput': {
+            'logins_per_min': args.pickers / (t_login - t_start) * 60,
+            'orders_packed_per_min': n_orders / (t_pack - t_login) * 60,
+            'rider_handoffs_per_min': n_orders / (t_rider - t_sync) * 60,
+        },
+        'sync': {'pack_outbox_drain_s': sync_pack, 'rider_outbox_drain_s': sync_rider, 'outbox': counts},
+        'api': dict(api, per_order=api['total'] / n_orders if n_orders else None),
+        'guard': backend.spreadsheet.guard.snapshot() if backend.spreadsheet.guard else {},
+        'spans': spans[spans['name'].str.startswith(('job.', 'flow.', 'stage.'))].round(4).to_dict('records'),
+        'problems': problems,
+    }
+
+    print(f"{args.pickers} pickers x {args.orders} orders x {args.items} items, fake latency {args.latency}s, "
+          f"error rate {args.error_rate}")
+    for k, s in report['flows'].items():
+        own = report['script_time'][k]
+        if s['count']: print(f"  {k:<6} n={s['count']:<4} wall p50 {s['p50']:.2f}s p95 {s['p95']:.2f}s max {s['max']:.2f}s"
+                             f" | own script p50 {own['p50']:.2f}s p95 {own['p95']:.2f}s")
+    for k, v in report['throughput'].items(): print(f"  {k:<24} {v:.1f}")
+    print(f"  outbox drain after packs {sync_pack if sync_pack is None else round(sync_pack, 2)}s, "
+          f"after riders {sync_rider if sync_rider is None else round(sync_rider, 2)}s  {counts}")
+    print(f"  API calls {api['total']} ({report['api']['per_order']:.1f}/order), injected errors {sum(api['injected'].values())}")
+    for op, n in sorted(api['calls'].items()): print(f"    {op:<32} {n}")
+    for row in report['spans']:
+        print(f"    {row['name']:<32} n={row['count']:<4} p50 {row['p50'] * 1000:8.1f}ms  p95 {row['p95'] * 1000:8.1f}ms")
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(report, f, indent=2, default=str)
+    for p in problems: print("PROBLEM:", p)
+    backend.uninstall()
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
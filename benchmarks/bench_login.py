@@ -0,0 +1,46 @@
+"""Login lookup: User-sheet DataFrame scan vs picking.users.UserIndex.
+
+    python benchmarks/bench_login.py [n_users] [n_logins]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking.users import UserIndex  # noqa: E402
+
+
+def make_user_frame(n):
+    return pd.DataFrame({'ID': [f"U{i:05d}" for i in range(n)], 'Password': [f"{i * 7919 % 10000:04d}" for i in range(n)],
+                         'Name': [f"Picker {i}" for i in range(n)]})
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    df = make_user_frame(n); rng = random.Random(1)
+    logins = [(f"U{k:05d}", f"{k * 7919 % 10000:04d}") for k in (rng.randrange(n) for _ in range(m))]
+
+    t0 = time.perf_counter()
+    for uid, pw in logins:
+        # แบบเดิม: Cast + Scan ทั้งชีทต่อครั้ง แล้วเทียบ Plaintext
+        match = df[df.iloc[:, 0].astype(str) == str(uid)]
+        assert not match.empty and pw == str(match.iloc[0, 1]).strip()
+    scan = (time.perf_counter() - t0) / m
+
+    t0 = time.perf_counter(); index = UserIndex.from_frame(df); build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for uid, pw in logins:
+        assert index.lookup(uid) and index.check(uid, pw)
+    lookup = (time.perf_counter() - t0) / m
+
+    print(f"{n} users, {m} logins")
+    print(f"  DataFrame scan      {scan * 1e6:9.1f} us / login")
+    print(f"  UserIndex           {lookup * 1e6:9.1f} us / login (lookup + digest check), build {build * 1000:.1f} ms once per refresh")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Catalog memory: old st.cache_data object frame vs the shared compact table.
+
+    python benchmarks/bench_memory.py [n_skus] [n_sessions]
+
+"before" = all-object DataFrame as the old load_sheet_data built it;
+st.cache_data unpickles a fresh copy for every call, so each session
+holding the frame pays its full size. "after" = SheetSync's compact frame
+(categorical repetitive columns) shared once per process, with each
+session holding a copy-on-write ``view()``, plus the Catalog index.
+"""
+import gc
+import os
+import pickle
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking.catalog import Catalog  # noqa: E402
+from picking.sheet_sync import rows_to_frame, compact_frame  # noqa: E402
+from bench_catalog import make_catalog_frame  # noqa: E402
+
+
+def traced(fn):
+    # Python-heap allocations only (ใช้กับ Index / View; ข้อมูลใน DataFrame วัดด้วย memory_usage)
+    gc.collect(); tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = fn()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return obj, size
+
+
+def frame_bytes(df): return int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    src = make_catalog_frame(n)
+    headers = list(src.columns); rows = src.astype(str).values.tolist()
+
+    old_df = pd.DataFrame(rows, columns=headers, dtype=object)
+    old_bytes = frame_bytes(old_df)
+    # cache_data: ทุก Session ได้ Copy ใหม่ (unpickle) ขนาดเท่าตารางเต็ม
+    old_session = frame_bytes(pickle.loads(pickle.dumps(old_df)))
+
+    new_df = compact_frame(rows_to_frame(headers, rows))
+    new_bytes = frame_bytes(new_df)
+    catalog, cat_bytes = traced(lambda: Catalog.from_frame(new_df))
+    _, views = traced(lambda: [new_df.copy(deep=False) for _ in range(sessions)])
+    new_session = views / sessions
+
+    print(f"{n:,} SKUs, {sessions} concurrent sessions")
+    print(f"{'':<26}{'bytes/SKU':>11}{'per session':>15}{f'total @{sessions}':>16}")
+    print(f"{'before (object, copies)':<26}{old_bytes / n:>11.0f}{old_session:>15,}{old_bytes + old_session * sessions:>16,}")
+    print(f"{'after (compact, views)':<26}{new_bytes / n:>11.0f}{new_session:>15,.0f}{new_bytes + cat_bytes + views:>16,}")
+    print(f"{'  of which Catalog index':<26}{cat_bytes / n:>11.0f}{'':>15}{cat_bytes:>16,}")
+    print("dtypes after:", dict(new_df.dtypes.astype(str)))
+
+
+if __name__ == "__main__":
+    main()
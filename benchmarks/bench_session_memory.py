@@ -0,0 +1,59 @@
+"""Session memory with photos in st.session_state vs the disk-backed BlobStore.
+
+    python benchmarks/bench_session_memory.py [n_sessions] [photos_per_session] [kb_per_photo]
+
+Each simulated session holds a full pack gallery (encoded photo + thumbnail
+per capture) plus a rider photo, the way the pack/rider pages keep them.
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking.blobstore import BlobStore  # noqa: E402
+
+
+def measure(build):
+    gc.collect(); tracemalloc.start()
+    sessions = build()
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return sessions, current
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    photos = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    kb = int(sys.argv[3]) if len(sys.argv) > 3 else 450
+    thumb_kb = 12
+
+    def in_memory():
+        return [{'photo_gallery': [{'data': os.urandom(kb * 1024), 'thumb': os.urandom(thumb_kb * 1024)} for _ in range(photos)],
+                 'rider_photo': {'data': os.urandom(kb * 1024), 'thumb': os.urandom(thumb_kb * 1024)}} for _ in range(n)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root)
+
+        def on_disk():
+            def capture():
+                # bytes ถูกสร้างแล้วเขียนลงไฟล์ทันที เหลือแค่ handle ใน Session
+                return {'blob': store.put(os.urandom(kb * 1024)), 'thumb': store.put(os.urandom(thumb_kb * 1024))}
+            return [{'photo_gallery': [capture() for _ in range(photos)], 'rider_photo': capture()} for _ in range(n)]
+
+        _, before = measure(in_memory)
+        sessions, after = measure(on_disk)
+        files, disk = store.usage()
+        print(f"{n} sessions x ({photos} + 1 rider) photos of {kb} KB")
+        print(f"{'session_state bytes':<24}{before / 1e6:>10.1f} MB  ({before / n / 1e3:,.0f} KB/session)")
+        print(f"{'BlobStore handles':<24}{after / 1e6:>10.2f} MB  ({after / n / 1e3:,.1f} KB/session)")
+        print(f"{'on disk':<24}{disk / 1e6:>10.1f} MB in {files} files")
+        for s in sessions:  # reset/logout
+            store.delete(*[h for it in s['photo_gallery'] + [s['rider_photo']] for h in it.values()])
+        print(f"after reset: {store.usage()[0]} files left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Cold start and per-rerun cost of Amaze_app_MFC_Gmail.py.
+
+    python benchmarks/bench_startup.py [--reruns 30] [--runs 3] [--app path] [--json out.json]
+
+time-to-first-paint: a fresh interpreter runs the login page once through
+AppTest (no Google account, ``PICKING_WARM_UP=0``), and reports that time,
+the same for a one-line script (AppTest's own cost), and which heavy
+modules the first paint had to import.
+
+per-rerun: against the in-process fakes in ``fakes.py``, a logged-in
+session reruns each page ``--reruns`` times. Reported per rerun: wall time
+and the time spent executing the script. AppTest starts a new runtime (and
+recompiles the main script) on every run, which a real server does not, so
+``exec`` is the number that matches production; the difference is the
+compile cost of the main script.
+
+``--app`` runs another copy of the app (e.g. an older revision saved next
+to the original) for comparison.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.environ.get('BENCH_APP') or os.path.join(ROOT, "Amaze_app_MFC_Gmail.py")
+HEAVY = ["pandas", "numpy", "PIL", "pyzbar", "gspread", "googleapiclient", "google.oauth2", "pyarrow"]
+PAGES = ["📦 แผนกแพ็คสินค้า", "📋 Batch Picking", "🏍️ ส่งงาน Rider"]
+
+
+def first_paint():
+    # รันใน Interpreter ใหม่ (ไม่มี Module ไหนถูก import ไว้ก่อน)
+    from streamlit.testing.v1 import AppTest
+    t0 = time.perf_counter(); AppTest.from_string("import streamlit as st\nst.title('x')").run(); null = time.perf_counter() - t0
+    at = AppTest.from_file(APP, default_timeout=60)
+    t0 = time.perf_counter(); at.run(); app = time.perf_counter() - t0
+    return {'null_script_s': null, 'first_paint_s': app, 'titles': [t.value for t in at.title],
+            'heavy_loaded': [m for m in HEAVY if m in sys.modules]}
+
+
+def reruns(n):
+    sys.path.insert(0, ROOT); sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from streamlit.testing.v1 import AppTest
+    from bench_catalog import make_catalog_frame
+    from fakes import FakeBackend
+    import streamlit.runtime.scriptrunner.script_runner as script_runner
+    exec_times = []; run_script = script_runner.exec_func_with_error_handling
+
+    def timed_exec(*a, **kw):
+        t0 = time.perf_counter()
+        try: return run_script(*a, **kw)
+        finally: exec_times.append(time.perf_counter() - t0)
+    script_runner.exec_func_with_error_handling = timed_exec
+    backend = FakeBackend(); backend.seed_catalog(make_catalog_frame(20_000)); backend.seed_users([("U001", "1234", "Picker 1")])
+    backend.install()
+    out = {}
+
+    def measure(label, at):
+        at.run()  # รอบแรก (สร้าง Resource / Catalog) ไม่นับ
+        times = []; del exec_times[:]
+        for _ in range(n):
+            t0 = time.perf_counter(); at.run(); times.append(time.perf_counter() - t0)
+        if at.exception: raise RuntimeError(f"{label}: {at.exception[0].message}")
+        times.sort(); execs = sorted(exec_times)
+        out[label] = {'median_ms': statistics.median(times) * 1000, 'p95_ms': times[int(len(times) * 0.95) - 1] * 1000,
+                      'exec_median_ms': statistics.median(execs) * 1000, 'exec_p95_ms': execs[int(len(execs) * 0.95) - 1] * 1000}
+
+    measure("login", AppTest.from_file(APP, default_timeout=60))
+    for page in PAGES:
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.session_state.current_user_name = "Picker 1"; at.session_state.current_user_id = "U001"; at.session_state.work_mode = page
+        if page == PAGES[0]: at.session_state.order_val = "B01"
+        measure(page, at)
+    return out
+
+
+def child(kind, n, app):
+    env = dict(os.environ, BENCH_APP=app)
+    if kind == "first": env['PICKING_WARM_UP'] = '0'  # วัดเฉพาะทางที่หน้าแรกต้อง import เอง
+    with tempfile.TemporaryDirectory() as tmp:
+        env.setdefault('PICKING_OUTBOX_PATH', os.path.join(tmp, "outbox.sqlite3")); env.setdefault('PICKING_BLOB_DIR', os.path.join(tmp, "blobs"))
+        env.setdefault('PICKING_ANALYTICS_DIR', os.path.join(tmp, "analytics"))
+        res = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", kind, "--reruns", str(n)], env=env,
+                             capture_output=True, text=True, cwd=ROOT)
+    if res.returncode: raise SystemExit(res.stderr[-3000:])
+    return json.loads(res.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=30)
+    ap.add_argument("--runs", type=int, default=3, help="fresh interpreters for first paint")
+    ap.add_argument("--app", default=APP)
+    ap.add_argument("--json")
+    ap.add_argument("--child")
+    args = ap.parse_args()
+    if args.child:
+        print(json.dumps(first_paint() if args.child == "first" else reruns(args.reruns))); return
+
+    paints = [child("first", 0, args.app) for _ in range(args.runs)]
+    report = {'first_paint': {'median_s': statistics.median(p['first_paint_s'] for p in paints),
+                              'null_script_s': statistics.median(p['null_script_s'] for p in paints),
+                              'heavy_loaded': paints[-1]['heavy_loaded'], 'titles': paints[-1]['titles']},
+              'rerun': child("rerun", args.reruns, args.app)}
+    fp = report['first_paint']
+    print(f"time-to-first-paint: {fp['median_s'] * 1000:.0f} ms (AppTest alone {fp['null_script_s'] * 1000:.0f} ms) "
+          f"| page {fp['titles']} | heavy modules loaded: {', '.join(fp['heavy_loaded']) or '-'}")
+    for page, s in report['rerun'].items():
+        print(f"  rerun {page:<22} wall median {s['median_ms']:6.1f} ms  p95 {s['p95_ms']:6.1f} ms | "
+              f"exec median {s['exec_median_ms']:6.1f} ms  p95 {s['exec_p95_ms']:6.1f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
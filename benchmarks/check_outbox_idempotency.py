@@ -0,0 +1,95 @@
+"""Fault injection for the outbox journal: kill a pack or rider job right
+after one of its remote steps (order folder created, photo uploaded, log
+rows appended) but before the step is journalled, retry it, and check
+that nothing was done twice or skipped.
+
+    python benchmarks/check_outbox_idempotency.py [--photos 2] [--items 3]
+
+Runs against the in-process fakes in ``fakes.py``. Each scenario is one
+order (a pack job, then a rider job queued against the pending pack
+folder) with the crash at one step. Exits non-zero unless every order ends
+with exactly one order folder, one upload per photo and one set of log
+rows in Logs and Rider_Logs.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+TMP = tempfile.mkdtemp(prefix="outbox_check_")
+os.environ['PICKING_OUTBOX_PATH'] = os.path.join(TMP, 'outbox.sqlite3')  # ก่อน import services
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from picking.outbox import Outbox, OutboxWorker  # noqa: E402
+from picking_app import services  # noqa: E402
+from fakes import FakeBackend, jpeg_bytes  # noqa: E402
+
+
+class CrashingOutbox(Outbox):
+    """Outbox whose ``record_step`` raises once for the step set in ``crash[job_id]``
+    (the remote call has already gone through, like a process killed mid-job)."""
+
+    def __init__(self, path):
+        super().__init__(path, base_delay=0, max_attempts=1)
+        self.crash = {}; self.crashed = []
+
+    def record_step(self, job_id, step, value):
+        if self.crash.get(job_id) == step:
+            del self.crash[job_id]; self.crashed.append((job_id, step))
+            raise RuntimeError(f"injected crash before journalling {step}")
+        super().record_step(job_id, step, value)
+
+
+def drain(outbox, worker, rounds=5):
+    # Job ที่ล้ม (max_attempts=1) -> ส่งใหม่เหมือนกด 🔁 ในหน้า Admin
+    for _ in range(rounds):
+        while worker.run_once(): pass
+        failed = outbox.jobs('failed')
+        if not failed: return
+        for job in failed: outbox.requeue(job['id'])
+
+
+def check_order(backend, order_id, photos, items):
+    folders = [f for f in backend.drive.folders() if f['name'].startswith(f"{order_id}_")]
+    uploads = [u for u in backend.drive.uploads() if folders and folders[0]['id'] in u['parents']]
+    got = {'folders': len(folders), 'uploads': len(uploads), 'log_rows': backend.rows(services.LOG_SHEET_NAME, order_id),
+           'rider_rows': backend.rows(services.RIDER_SHEET_NAME, order_id)}
+    want = {'folders': 1, 'uploads': photos + 1, 'log_rows': items, 'rider_rows': 1}
+    return [f"{k} {got[k]} != {want[k]}" for k in want if got[k] != want[k]]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--photos", type=int, default=2)
+    ap.add_argument("--items", type=int, default=3)
+    args = ap.parse_args()
+
+    backend = FakeBackend(); backend.install()
+    outbox = CrashingOutbox(os.environ['PICKING_OUTBOX_PATH'])
+    worker = OutboxWorker(outbox, {'pack_order': services.process_pack_job, 'rider_photo': services.process_rider_job})
+    items = [{'Barcode': f"885{i:07d}", 'Product Name': f"Item {i}", 'Location': "A-01", 'Qty': 1} for i in range(args.items)]
+    scenarios = [(None, None)] + [('pack_order', s) for s in ['folder'] + [f"upload:{i}" for i in range(args.photos)] + ['log']] \
+        + [('rider_photo', s) for s in ('folder', 'upload:0', 'log')]
+
+    problems = 0
+    for n, (kind, step) in enumerate(scenarios):
+        order_id = f"CHK{n:02d}"
+        pack_id = outbox.enqueue('pack_order', {
+            'order_id': order_id, 'picker_name': "Checker", 'user_id': "U000", 'items': items,
+            'timestamp': services.get_thai_time(), 'ts': services.get_thai_ts_filename()}, blobs=[jpeg_bytes()] * args.photos)
+        rider_id = outbox.enqueue('rider_photo', {
+            'order_id': order_id, 'picker_name': "Rider", 'folder_id': services.PENDING_FOLDER_ID, 'folder_name': "-",
+            'filename': f"RIDER_{order_id}.jpg", 'timestamp': services.get_thai_time()}, blobs=[jpeg_bytes()])
+        if kind: outbox.crash[pack_id if kind == 'pack_order' else rider_id] = step
+        drain(outbox, worker)
+        errors = check_order(backend, order_id, args.photos, len(items))
+        if kind and (pack_id if kind == 'pack_order' else rider_id, step) not in outbox.crashed: errors.append("crash not reached")
+        errors += [f"job {job['id']} still failed" for job in outbox.jobs('failed')]
+        problems += bool(errors)
+        print(f"  {order_id}  crash {f'{kind} after {step}' if kind else 'none':<28} {'OK' if not errors else 'FAIL: ' + ', '.join(errors)}")
+
+    print(f"{len(scenarios)} scenarios, {problems} with duplicated or missing work; outbox {outbox.counts()}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Local fake of the Drive v3 / Sheets v4 REST endpoints the app uses,
+with injectable latency and errors (429 by default).
+
+    server = FakeGoogleAPI(error_rate=0.3).start()
+    server.url  # http://127.0.0.1:<port>
+
+Drive: GET/POST /drive/v3/files, POST /upload/drive/v3/files (simple and
+multipart). Sheets: GET /v4/spreadsheets/<id>/values/<range> and
+POST /v4/spreadsheets/<id>/values/<range>:append.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class FakeGoogleAPI:
+    def __init__(self, error_rate=0.0, error_status=429, latency=0.0, retry_after=None, seed=None):
+        self.error_rate = error_rate; self.error_status = error_status
+        self.latency = latency; self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.files = {}    # id -> {'id', 'name', 'parents', 'mimeType'}
+        self.values = {}   # range (sheet name) -> [[...], ...]
+        self.requests = 0; self.injected = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- fault injection ---
+    def _maybe_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.rng.random() < self.error_rate:
+                self.injected += 1; return True
+        return False
+
+    # --- Drive ---
+    def list_files(self, q):
+        name = re.search(r"name = '([^']*)'", q or ""); contains = re.search(r"name contains '([^']*)'", q or "")
+        parent = re.search(r"'([^']*)' in parents", q or "")
+        out = []
+        for f in self.files.values():
+            if name and f['name'] != name.group(1): continue
+            if contains and contains.group(1) not in f['name']: continue
+            if parent and parent.group(1) not in f['parents']: continue
+            out.append({'id': f['id'], 'name': f['name']})
+        return {'files': out[::-1]}
+
+    def create_file(self, meta):
+        with self._lock:
+            fid = f"fake{len(self.files) + 1}"
+            self.files[fid] = {'id': fid, 'name': meta.get('name', ''), 'parents': meta.get('parents', []),
+                               'mimeType': meta.get('mimeType', '')}
+        return {'id': fid}
+
+    # --- Sheets ---
+    def get_values(self, rng):
+        return {'range': rng, 'values': self.values.get(rng.split('!')[0], [])}
+
+    def append_values(self, rng, body):
+        rows = body.get('values', [])
+        with self._lock: self.values.setdefault(rng.split('!')[0], []).extend(rows)
+        return {'updates': {'updatedRows': len(rows)}}
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *a): pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json'); self.send_header('Content-Length', str(len(data)))
+                for k, v in (headers or {}).items(): self.send_header(k, v)
+                self.end_headers(); self.wfile.write(data)
+
+            def _body(self):
+                n = int(self.headers.get('Content-Length') or 0)
+                return self.rfile.read(n) if n else b''
+
+            def _route(self, method):
+                if api.latency: time.sleep(api.latency)
+                raw = self._body()
+                if api._maybe_fail():
+                    headers = {'Retry-After': str(api.retry_after)} if api.retry_after is not None else None
+                    return self._send(api.error_status, {'error': {'code': api.error_status, 'message': 'injected',
+                                                                   'errors': [{'reason': 'rateLimitExceeded'}]}}, headers)
+                url = urlparse(self.path); path = unquote(url.path); qs = parse_qs(url.query)
+                if path.endswith('/drive/v3/files') and method == 'GET':
+                    return self._send(200, api.list_files(qs.get('q', [''])[0]))
+                if path.endswith('/drive/v3/files') and method == 'POST':
+                    if path.startswith('/upload/'):
+                        meta = {}
+                        m = re.search(rb'\{.*?\}', raw, re.S)
+                        if m: meta = json.loads(m.group(0))
+                        return self._send(200, api.create_file(meta))
+                    return self._send(200, api.create_file(json.loads(raw or b'{}')))
+                m = re.match(r'.*/v4/spreadsheets/[^/]+/values/(.+?)(:append)?$', path)
+                if m and method == 'GET': return self._send(200, api.get_values(m.group(1)))
+                if m and m.group(2) and method == 'POST':
+                    return self._send(200, api.append_values(m.group(1), json.loads(raw or b'{}')))
+                return self._send(404, {'error': {'code': 404, 'message': f'no fake for {method} {path}'}})
+
+            def do_GET(self): self._route('GET')
+            def do_POST(self): self._route('POST')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self): return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server: self._server.shutdown(); self._server.server_close()
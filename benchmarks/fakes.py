@@ -0,0 +1,297 @@
+"""In-process stand-ins for the gspread spreadsheet and the Drive v3 service,
+with configurable latency and error injection.
+
+    backend = FakeBackend(Faults(latency=0.05, error_rate=0.02, seed=1))
+    backend.seed_users([("U001", "1234", "Picker 1")]); backend.seed_catalog(frame)
+    backend.install()   # GoogleClients.spreadsheet()/drive() now return the fakes
+
+Unlike ``fake_api.py`` (a local HTTP server for the client libraries), these
+fakes skip HTTP entirely, so a load test measures the app and not the
+loopback stack. Calls still go through the ``GoogleClients`` ``ApiGuard``
+(rate limits, retries, ``api.*`` spans) once installed. Injected errors are
+real ``HttpError``s with the given status, so the retry layer treats them
+exactly like Google's.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+import httplib2
+from googleapiclient.errors import HttpError
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_to_rowcol
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+
+
+class Faults:
+    """Latency (``latency`` +/- ``jitter`` seconds) and error injection shared by the fakes."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=429, seed=None, sleep=time.sleep):
+        self.latency = latency; self.jitter = jitter
+        self.error_rate = error_rate; self.error_status = error_status
+        self.rng = random.Random(seed); self._sleep = sleep
+        self._lock = threading.Lock()
+        self.calls = Counter(); self.injected = Counter()
+
+    def hit(self, op):
+        with self._lock:
+            self.calls[op] += 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)) if self.latency or self.jitter else 0.0
+            fail = self.rng.random() < self.error_rate
+            if fail: self.injected[op] += 1
+        if delay: self._sleep(delay)
+        if fail:
+            content = json.dumps({'error': {'code': self.error_status, 'message': 'injected',
+                                            'errors': [{'reason': 'rateLimitExceeded'}]}}).encode()
+            raise HttpError(httplib2.Response({'status': self.error_status}), content)
+
+    def snapshot(self):
+        with self._lock:
+            return {'calls': dict(self.calls), 'injected': dict(self.injected), 'total': sum(self.calls.values())}
+
+
+def _through(guard, api, op, fn):
+    # เหมือน GuardedHTTPClient / GuardedHttpRequest: POST (append, create, batchUpdate) ไม่ idempotent
+    idempotent = api != 'sheets_write' and not op.endswith('.create')
+    return guard.call(api, fn, op=op, idempotent=idempotent) if guard is not None else fn()
+
+
+# --- gspread ---
+class _Cell:
+    def __init__(self, value): self.value = value
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows=None):
+        self.spreadsheet = spreadsheet; self.title = title
+        self._rows = [list(map(str, r)) for r in (rows or [])]
+        self._lock = threading.Lock()
+
+    def _call(self, api, op, fn):
+        def run():
+            self.spreadsheet.faults.hit(op); return fn()
+        return _through(self.spreadsheet.guard, api, op, run)
+
+    def get_all_values(self):
+        return self._call('sheets_read', 'sheets.values', lambda: [list(r) for r in self._snapshot()])
+
+    def get(self, range_name):
+        start = range_name.split(':')[0]
+        row = a1_to_rowcol(start)[0] if re.search(r'\d', start) else 1
+        return self._call('sheets_read', 'sheets.values', lambda: [list(r) for r in self._snapshot()[row - 1:]])
+
+    def acell(self, label):
+        r, c = a1_to_rowcol(label)
+
+        def read():
+            rows = self._snapshot()
+            return _Cell(rows[r - 1][c - 1] if r <= len(rows) and c <= len(rows[r - 1]) else None)
+        return self._call('sheets_read', 'sheets.values', read)
+
+    def append_row(self, values, **kwargs): return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values, **kwargs):
+        def write():
+            with self._lock: self._rows.extend([list(map(str, r)) for r in values])
+            return {'updates': {'updatedRows': len(values)}}
+        return self._call('sheets_write', 'sheets.values:append', write)
+
+    def _snapshot(self):
+        with self._lock: return list(self._rows)
+
+    @property
+    def row_count(self): return len(self._snapshot())
+
+
+class FakeSpreadsheet:
+    def __init__(self, faults=None, guard=None, id="fake-sheet", title=""):
+        self.faults = faults or Faults(); self.guard = guard
+        self.id = id; self.title = title
+        self._sheets = []
+        self._lock = threading.Lock()
+
+    def seed(self, title, rows, index=None):
+        ws = FakeWorksheet(self, title, rows)
+        with self._lock:
+            self._sheets = [s for s in self._sheets if s.title != title]
+            self._sheets.insert(len(self._sheets) if index is None else index, ws)
+        return ws
+
+    def _call(self, op, fn, api='sheets_read'):
+        def run():
+            self.faults.hit(op); return fn()
+        return _through(self.guard, api, op, run)
+
+    def worksheets(self):
+        with self._lock: return list(self._sheets)
+
+    def get_worksheet(self, index):
+        sheets = self._call('sheets.spreadsheet', self.worksheets)
+        return sheets[index] if index < len(sheets) else None
+
+    def worksheet(self, title):
+        def find():
+            for ws in self.worksheets():
+                if ws.title == title: return ws
+            raise WorksheetNotFound(title)
+        return self._call('sheets.spreadsheet', find)
+
+    def add_worksheet(self, title, rows=1000, cols=26, index=None):
+        return self._call('sheets.spreadsheet:batchUpdate', lambda: self.seed(title, [], index), api='sheets_write')
+
+
+class FakeClient:
+    """``gspread.Client`` stand-in: ``create`` / ``open_by_key`` over the backend's spreadsheets."""
+
+    def __init__(self, backend): self.backend = backend
+
+    def create(self, title, folder_id=None):
+        faults = self.backend.faults
+        return _through(self.backend.spreadsheet.guard, 'drive', 'drive.files.create',
+                        lambda: (faults.hit('drive.files.create'), self.backend.add_spreadsheet(title))[1])
+
+    def open_by_key(self, key):
+        def find():
+            self.backend.faults.hit('sheets.spreadsheet')
+            return self.backend.spreadsheets[key]
+        return _through(self.backend.spreadsheet.guard, 'sheets_read', 'sheets.spreadsheet', find)
+
+
+# --- Drive v3 ---
+class _Request:
+    def __init__(self, drive, op, fn):
+        self.drive = drive; self.op = op; self.fn = fn
+
+    def execute(self, http=None, num_retries=0):
+        def run():
+            self.drive.faults.hit(self.op); return self.fn()
+        return _through(self.drive.guard, 'drive', self.op, run)
+
+
+def _media_size(media):
+    if media is None: return 0
+    try: return media.size()
+    except (AttributeError, TypeError): return len(media.getbytes(0, -1))
+
+
+class _Files:
+    def __init__(self, drive): self.drive = drive
+
+    def list(self, q=None, fields=None, orderBy=None, **kwargs):
+        return _Request(self.drive, 'drive.files.list', lambda: {'files': self.drive.query(q or '', orderBy)})
+
+    def create(self, body=None, media_body=None, fields=None, **kwargs):
+        return _Request(self.drive, 'drive.files.create', lambda: {'id': self.drive.add(body or {}, _media_size(media_body))})
+
+
+class FakeDrive:
+    def __init__(self, faults=None, guard=None):
+        self.faults = faults or Faults(); self.guard = guard
+        self.files_by_id = {}
+        self._lock = threading.Lock()
+        self.bytes_uploaded = 0
+
+    def files(self): return _Files(self)
+
+    def add(self, meta, size=0):
+        with self._lock:
+            fid = f"fake{len(self.files_by_id) + 1}"
+            self.files_by_id[fid] = {'id': fid, 'name': meta.get('name', ''), 'parents': list(meta.get('parents', [])),
+                                     'mimeType': meta.get('mimeType', 'image/jpeg'), 'size': size, 'created': time.time()}
+            self.bytes_uploaded += size
+        return fid
+
+    def query(self, q, order_by=None):
+        name = re.search(r"name = '([^']*)'", q); contains = re.search(r"name contains '([^']*)'", q)
+        parent = re.search(r"'([^']*)' in parents", q); mime = re.search(r"mimeType = '([^']*)'", q)
+        with self._lock: files = list(self.files_by_id.values())
+        out = [f for f in files
+               if (not name or f['name'] == name.group(1)) and (not contains or contains.group(1) in f['name'])
+               and (not parent or parent.group(1) in f['parents']) and (not mime or f['mimeType'] == mime.group(1))]
+        if order_by and order_by.startswith('createdTime'): out.sort(key=lambda f: f['created'], reverse=order_by.endswith('desc'))
+        return [{'id': f['id'], 'name': f['name']} for f in out]
+
+    def folders(self): return [f for f in self.files_by_id.values() if f['mimeType'] == FOLDER_MIME]
+
+    def uploads(self): return [f for f in self.files_by_id.values() if f['mimeType'] != FOLDER_MIME]
+
+
+class FakeBackend:
+    """One fake spreadsheet + Drive pair that ``install()`` wires into ``GoogleClients``."""
+
+    def __init__(self, faults=None, drive_faults=None):
+        self.faults = faults or Faults()
+        self.spreadsheet = FakeSpreadsheet(self.faults)
+        self.spreadsheets = {self.spreadsheet.id: self.spreadsheet}  # + ไฟล์ที่สร้างผ่าน FakeClient.create
+        self.drive = FakeDrive(drive_faults or self.faults)
+        self.client = FakeClient(self)
+        self._saved = None
+
+    def add_spreadsheet(self, title):
+        sh = FakeSpreadsheet(self.faults, self.spreadsheet.guard, id=f"fake-sheet{len(self.spreadsheets) + 1}", title=title)
+        self.spreadsheets[sh.id] = sh
+        return sh
+
+    def rows(self, base, order_id=None):
+        """Data rows written to ``base`` across all spreadsheets and ``base``/``base_<period>`` worksheets
+        (only those whose Order ID column C is ``order_id``, if given)."""
+        sheets = [ws for sh in self.spreadsheets.values() for ws in sh.worksheets() if ws.title == base or ws.title.startswith(base + "_")]
+        if order_id is None: return sum(max(0, ws.row_count - 1) for ws in sheets)
+        return sum(1 for ws in sheets for r in ws._snapshot()[1:] if len(r) > 2 and r[2] == order_id)
+
+    def seed_catalog(self, frame, index=0):
+        rows = [list(frame.columns)] + frame.astype(str).values.tolist()
+        return self.spreadsheet.seed("Products", rows, index)
+
+    def seed_users(self, users, title="User", headers=("ID", "Password", "Name")):
+        return self.spreadsheet.seed(title, [list(headers)] + [list(u) for u in users])
+
+    def install(self):
+        """Patch ``GoogleClients`` so every instance in this process talks to the fakes."""
+        from picking import google_clients
+        backend = self; cls = google_clients.GoogleClients
+        self._saved = (cls, {k: cls.__dict__[k] for k in ('credentials', 'gspread_client', 'spreadsheet', 'drive')})
+
+        def credentials(clients): return object()
+
+        def spreadsheet(clients):
+            for sh in backend.spreadsheets.values(): sh.guard = clients.guard
+            return backend.spreadsheet
+
+        def gspread_client(clients):
+            spreadsheet(clients); return backend.client
+
+        def drive(clients):
+            backend.drive.guard = clients.guard; return backend.drive
+
+        cls.credentials = credentials; cls.gspread_client = gspread_client; cls.spreadsheet = spreadsheet; cls.drive = drive
+        return self
+
+    def uninstall(self):
+        if self._saved:
+            cls, methods = self._saved
+            for k, v in methods.items(): setattr(cls, k, v)
+            self._saved = None
+
+    def api_calls(self):
+        out = self.faults.snapshot()
+        if self.drive.faults is not self.faults:
+            d = self.drive.faults.snapshot()
+            out = {'calls': {**out['calls'], **d['calls']}, 'injected': {**out['injected'], **d['injected']},
+                   'total': out['total'] + d['total']}
+        return out
+
+
+def jpeg_bytes(edge=1200, quality=85, seed=0):
+    """A noisy JPEG roughly the size of a phone capture (for camera stand-ins)."""
+    from PIL import Image
+    rng = random.Random(seed)
+    img = Image.effect_noise((edge, edge * 3 // 4), 40).convert('RGB')
+    img.paste((rng.randrange(256), rng.randrange(256), rng.randrange(256)), (0, 0, edge // 3, edge // 4))
+    buf = io.BytesIO(); img.save(buf, 'JPEG', quality=quality)
+    return buf.getvalue()
@@ -0,0 +1,74 @@
+"""Drive the rate limiter / retry layer against the local fake API with
+injected 429s and report what the ApiGuard did.
+
+    python benchmarks/harness_ratelimit.py [--error-rate 0.3] [--calls 40] [--threads 8]
+
+Exits non-zero if any call still failed after retries.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from google.oauth2.credentials import Credentials  # noqa: E402
+from picking.drive_folders import create_folder, find_folder  # noqa: E402
+from picking.drive_upload import upload_bytes  # noqa: E402
+from picking.google_clients import GoogleClients  # noqa: E402
+from picking.ratelimit import ApiGuard  # noqa: E402
+from fake_api import FakeGoogleAPI  # noqa: E402
+
+
+def fake_credentials():
+    creds = Credentials("fake-token", refresh_token="r", token_uri="http://127.0.0.1/token", client_id="c", client_secret="s")
+    creds.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    return creds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--error-rate", type=float, default=0.3)
+    ap.add_argument("--status", type=int, default=429)
+    ap.add_argument("--calls", type=int, default=40)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--sheets-per-minute", type=int, default=600)
+    ap.add_argument("--drive-per-minute", type=int, default=6000)
+    args = ap.parse_args()
+
+    api = FakeGoogleAPI(error_rate=args.error_rate, error_status=args.status, seed=1).start()
+    guard = ApiGuard(quotas={'sheets_read': args.sheets_per_minute, 'sheets_write': args.sheets_per_minute,
+                             'drive': args.drive_per_minute},
+                     base=0.05, cap=0.5, max_attempts=8)
+    clients = GoogleClients(fake_credentials, "fake-sheet", guard=guard, drive_endpoint=api.url + "/drive/v3/")
+    sheets_http = clients.gspread_client().http_client
+    values_url = f"{api.url}/v4/spreadsheets/fake-sheet/values/Logs"
+
+    def drive_job(i):
+        srv = clients.drive()
+        parent = create_folder(srv, "root", f"folder{i}")
+        assert find_folder(srv, "root", f"folder{i}") == parent
+        return upload_bytes(srv, b"\xff\xd8fake-jpeg", f"img{i}.jpg", parent)
+
+    def sheets_job(i):
+        sheets_http.request("post", values_url + ":append", params={"valueInputOption": "RAW"},
+                            json={"values": [[str(i), "picker", "ORDER"]]})
+        return sheets_http.request("get", values_url).json()
+
+    failures = 0
+    with ThreadPoolExecutor(args.threads) as pool:
+        for fut in [pool.submit(drive_job, i) for i in range(args.calls)] + \
+                   [pool.submit(sheets_job, i) for i in range(args.calls)]:
+            try: fut.result()
+            except Exception as e: failures += 1; print("FAILED:", e)
+
+    print(f"fake API: {api.requests} requests, {api.injected} injected {args.status}s")
+    print(json.dumps(guard.snapshot(), indent=2))
+    print(f"appended rows: {len(api.values.get('Logs', []))} / {args.calls}, failures after retry: {failures}")
+    api.stop()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
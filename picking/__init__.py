@@ -0,0 +1 @@
+"""Helper modules for the Smart Picking app (Amaze_app_MFC_Gmail.py)."""
@@ -0,0 +1,323 @@
+"""Shift analytics over the pick logs, from a local columnar snapshot.
+
+``LogSnapshot`` keeps a local copy of a log sheet (``Logs``, ``Rider_Logs``,
+or all their partitions) as Parquet part files (pickle when pyarrow is not
+installed). A refresh only fetches the rows below the last row it has seen,
+at most once per ``min_interval`` for the whole process, and partitions
+that ended before yesterday are not read again. Dashboards read the
+in-memory frame, so opening one costs no sheet reads.
+
+``ScanLog`` records location scans (right/wrong bin) locally; the logs only
+hold successful picks, so this is where error rates come from. Scans are
+appended to a small JSON-lines file and folded into the same kind of part
+files (then the file is truncated) at most once per ``min_interval``, so
+its ``generation``, like a snapshot's, changes once per pull and not on
+every scan.
+
+The aggregation helpers are plain vectorised pandas over those frames.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET = True
+except ImportError:
+    PARQUET = False
+
+MIN_PULL_INTERVAL = 300     # วินาที: ดึงแถวใหม่จากชีทไม่บ่อยกว่านี้ (ทั้ง Process)
+COMPACT_PARTS = 50          # รวม Part file เมื่อเกินจำนวนนี้
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _col_letter(n):
+    s = ""
+    while n: n, r = divmod(n - 1, 26); s = chr(65 + r) + s
+    return s
+
+
+class _PartStore:
+    """Part files + ``meta.json`` in ``directory`` (shared by LogSnapshot and ScanLog)."""
+
+    columns = ()
+
+    @property
+    def _meta_path(self): return os.path.join(self.directory, "meta.json")
+
+    def _read_meta(self, default):
+        try:
+            with open(self._meta_path, encoding='utf-8') as f: return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write_meta(self):
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f: json.dump(self._meta, f)
+        os.replace(tmp, self._meta_path)
+
+    def _part_files(self):
+        ext = ".parquet" if PARQUET else ".pkl"
+        return sorted(os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.startswith("part-") and f.endswith(ext))
+
+    def _write_part(self, df):
+        self._meta['parts'] = self._meta.get('parts', 0) + 1
+        path = os.path.join(self.directory, f"part-{self._meta['parts']:06d}" + (".parquet" if PARQUET else ".pkl"))
+        if PARQUET: df.to_parquet(path, index=False)
+        else: df.to_pickle(path)
+
+    def _read_parts(self):
+        files = self._part_files()
+        if not files: return pd.DataFrame(columns=list(self.columns))
+        frames = [pd.read_parquet(f) if PARQUET else pd.read_pickle(f) for f in files]
+        return pd.concat(frames, ignore_index=True)
+
+    def _compact(self, df):
+        files = self._part_files()
+        if len(files) <= COMPACT_PARTS: return
+        self._write_part(df)
+        for f in files: os.remove(f)
+
+
+class LogSnapshot(_PartStore):
+    """Incremental local snapshot of one log (all of its sources).
+
+    ``sources()`` returns ``[(key, open_worksheet, end_date or None), ...]``,
+    one per worksheet holding rows of this log (the sheet itself, or each
+    partition). ``end_date`` lets finished partitions be skipped.
+    """
+
+    def __init__(self, directory, sources, headers, min_interval=MIN_PULL_INTERVAL, name="log"):
+        self.directory = directory; self.sources = sources; self.headers = self.columns = list(headers)
+        self.min_interval = min_interval; self.name = name
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock(); self._pull_lock = threading.Lock()
+        self._df = None; self._typed = None; self._refreshing = False
+        self.generation = 0  # เพิ่มทุกครั้งที่มีแถวใหม่ (ใช้เป็น Key ของ Cache ที่คำนวณจาก Snapshot)
+        self._meta = self._read_meta({'sources': {}, 'parts': 0})
+        self.stats = {'pulls': 0, 'rows_pulled': 0, 'sheet_reads': 0, 'errors': 0, 'last_pull': self._meta.get('last_pull')}
+
+    # --- data ---
+    def raw(self):
+        """All snapshot rows as strings (loaded from disk on first use)."""
+        with self._lock:
+            if self._df is None: self._df = self._read_parts()
+            return self._df
+
+    def frame(self):
+        """Typed view (Timestamp as datetime, Pick Qty numeric, names/locations as category), rebuilt only when rows arrive."""
+        raw = self.raw()
+        with self._lock:
+            if self._typed is None or self._typed[0] is not raw: self._typed = (raw, typed_logs(raw))
+            return self._typed[1]
+
+    def due(self):
+        return time.time() - (self.stats['last_pull'] or 0) >= self.min_interval
+
+    def refresh_async(self, force=False):
+        if self._refreshing or not (force or self.due()): return False
+        self._refreshing = True
+        threading.Thread(target=self._background_refresh, name=f"analytics-{self.name}", daemon=True).start()
+        return True
+
+    def _background_refresh(self):
+        try: self.refresh(force=True)
+        finally: self._refreshing = False
+
+    def refresh(self, force=False):
+        """Pull new rows from every open source; returns how many were added."""
+        with self._pull_lock:
+            if not (force or self.due()): return 0
+            return self._pull()
+
+    def _pull(self):
+        raw = self.raw(); added = []
+        yesterday = date.today() - timedelta(days=1)
+        try:
+            for key, open_ws, end in self.sources():
+                state = self._meta['sources'].setdefault(key, {'rows': 0, 'synced': None})
+                if end and state['synced'] and end < yesterday and date.fromisoformat(state['synced'][:10]) > end: continue
+                start = state['rows'] + 2  # แถว 1 = Header
+                values = list(open_ws().get(f"A{start}:{_col_letter(len(self.headers))}"))
+                self.stats['sheet_reads'] += 1
+                state['synced'] = datetime.now().isoformat(timespec='seconds')
+                if not values: continue
+                width = len(self.headers)
+                added.append(pd.DataFrame([list(r[:width]) + [''] * (width - len(r)) for r in values], columns=self.headers))
+                state['rows'] += len(values)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"❌ ANALYTICS PULL ERROR ({self.name}): {e}")
+            traceback.print_exc()
+        finally:
+            self.stats['last_pull'] = self._meta['last_pull'] = time.time()
+            self.stats['pulls'] += 1
+        if added:
+            delta = pd.concat(added, ignore_index=True)
+            with self._lock:
+                self._write_part(delta)
+                self._df = pd.concat([raw, delta], ignore_index=True) if len(raw) else delta
+                self._compact(self._df); self.generation += 1
+            self.stats['rows_pulled'] += len(delta)
+        self._write_meta()
+        return sum(len(a) for a in added)
+
+    def reset(self):
+        """Drop the local copy (next refresh pulls everything again)."""
+        with self._lock:
+            for f in self._part_files(): os.remove(f)
+            self._meta = {'sources': {}, 'parts': 0}; self._df = None; self._typed = None; self.generation += 1
+            self.stats['last_pull'] = None
+            self._write_meta()
+
+
+SCAN_COLUMNS = ['ts', 'location', 'scanned', 'ok', 'picker', 'barcode']
+
+
+class ScanLog(_PartStore):
+    """Location scans: ``record`` appends a JSON line, ``refresh`` folds new lines into part files (thread-safe)."""
+
+    columns = SCAN_COLUMNS
+
+    def __init__(self, directory, min_interval=MIN_PULL_INTERVAL):
+        self.directory = directory; self.min_interval = min_interval
+        self.path = os.path.join(directory, "pending.jsonl")
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock(); self._df = None; self._refreshing = False
+        self.generation = 0
+        self._meta = self._read_meta({'parts': 0})
+        self.stats = {'pulls': 0, 'rows_pulled': 0, 'last_pull': self._meta.get('last_pull')}
+
+    def record(self, location, scanned, ok, picker="", barcode="", ts=None):
+        rec = {'ts': ts or datetime.now().strftime(TIMESTAMP_FORMAT), 'location': location, 'scanned': scanned,
+               'ok': bool(ok), 'picker': picker, 'barcode': barcode}
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f: f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def frame(self):
+        """Scans folded so far (``ts`` as datetime); new records show up after the next ``refresh``."""
+        with self._lock:
+            if self._df is None: self._df = self._read_parts()
+            return self._df
+
+    def due(self):
+        return time.time() - (self.stats['last_pull'] or 0) >= self.min_interval
+
+    def refresh_async(self, force=False):
+        if self._refreshing or not (force or self.due()): return False
+        self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="analytics-scans", daemon=True).start()
+        return True
+
+    def _background_refresh(self):
+        try: self.refresh(force=True)
+        finally: self._refreshing = False
+
+    def refresh(self, force=False):
+        """Move pending records into a part file and truncate the JSON-lines file; returns how many."""
+        if not (force or self.due()): return 0
+        with self._lock:
+            if self._df is None: self._df = self._read_parts()
+            old = self._df
+            self.stats['last_pull'] = self._meta['last_pull'] = time.time(); self.stats['pulls'] += 1
+            try:
+                with open(self.path, encoding='utf-8') as f: lines = f.read().splitlines()
+            except FileNotFoundError:
+                lines = []
+            recs = []
+            for line in lines:
+                try: recs.append(json.loads(line))
+                except ValueError: pass  # บรรทัดที่เขียนไม่จบ (Process ตายกลางทาง)
+            if recs:
+                delta = pd.DataFrame(recs).reindex(columns=SCAN_COLUMNS)
+                delta['ts'] = pd.to_datetime(delta['ts'], format=TIMESTAMP_FORMAT, errors='coerce')
+                self._write_part(delta)
+                self._df = pd.concat([old, delta], ignore_index=True) if len(old) else delta
+                self._compact(self._df); self.generation += 1
+                self.stats['rows_pulled'] += len(recs)
+            self._write_meta()
+            if lines: open(self.path, 'w').close()  # อยู่ใน Part แล้ว -> ล้างไฟล์ (record รอ Lock เดียวกัน)
+        return len(recs)
+
+
+# --- aggregations ---
+def typed_logs(raw):
+    df = raw.copy()
+    if 'Timestamp' in df: df['Timestamp'] = pd.to_datetime(df['Timestamp'], format=TIMESTAMP_FORMAT, errors='coerce')
+    if 'Pick Qty' in df: df['Pick Qty'] = pd.to_numeric(df['Pick Qty'], errors='coerce').fillna(0).astype('int64')
+    for c in ('Picker Name', 'User', 'User Name', 'Location'):
+        if c in df: df[c] = df[c].astype('category')
+    return df
+
+
+def between(df, start, end, col='Timestamp'):
+    """Rows with ``col`` on a date in ``[start, end]``."""
+    if df.empty: return df
+    lo = pd.Timestamp(start); hi = pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[(df[col] >= lo) & (df[col] < hi)]
+
+
+def picks_per_hour(logs, by=('Picker Name', 'User')):
+    """Per picker: lines, units, orders, active hours and lines/units per active hour."""
+    by = [c for c in by if c in logs]
+    cols = ['lines', 'units', 'orders', 'active_hours', 'lines_per_hour', 'units_per_hour']
+    if logs.empty or not by: return pd.DataFrame(columns=by + cols)
+    hour = logs['Timestamp'].dt.floor('h')
+    g = logs.assign(_hour=hour).groupby(by, observed=True)
+    out = pd.DataFrame({'lines': g.size(), 'units': g['Pick Qty'].sum(), 'orders': g['Order ID'].nunique(),
+                        'active_hours': g['_hour'].nunique()})
+    out['lines_per_hour'] = out['lines'] / out['active_hours']
+    out['units_per_hour'] = out['units'] / out['active_hours']
+    return out.reset_index().sort_values('lines_per_hour', ascending=False)
+
+
+def hourly(logs, by='Picker Name', value='lines'):
+    """Hour x picker matrix of lines (or units) for charts."""
+    if logs.empty: return pd.DataFrame()
+    hour = logs['Timestamp'].dt.floor('h')
+    if value == 'units': return logs.pivot_table(index=hour, columns=by, values='Pick Qty', aggfunc='sum', fill_value=0, observed=True)
+    return logs.groupby([hour, by], observed=True).size().unstack(fill_value=0)
+
+
+def order_cycle_times(logs, rider=None):
+    """Per order: first and last timestamp over pick and rider logs, and the seconds between."""
+    frames = [logs[['Order ID', 'Timestamp']]]
+    if rider is not None and not rider.empty: frames.append(rider[['Order ID', 'Timestamp']])
+    both = pd.concat(frames, ignore_index=True).dropna(subset=['Timestamp'])
+    if both.empty: return pd.DataFrame(columns=['Order ID', 'first', 'last', 'seconds'])
+    g = both.groupby('Order ID')['Timestamp']
+    out = pd.DataFrame({'first': g.min(), 'last': g.max()})
+    out['seconds'] = (out['last'] - out['first']).dt.total_seconds()
+    return out.reset_index().sort_values('first')
+
+
+def order_gaps(logs, by='Picker Name'):
+    """Seconds between consecutive confirmed orders of the same picker (pick-to-pick cycle)."""
+    if logs.empty: return pd.DataFrame(columns=[by, 'Order ID', 'Timestamp', 'gap_seconds'])
+    orders = logs.groupby([by, 'Order ID'], observed=True)['Timestamp'].min().reset_index().sort_values([by, 'Timestamp'])
+    orders['gap_seconds'] = orders.groupby(by, observed=True)['Timestamp'].diff().dt.total_seconds()
+    return orders
+
+
+def shift_report(logs, rider, scans):
+    """Everything the dashboard shows, computed in one go (cache the result per snapshot generation)."""
+    cycles = order_cycle_times(logs, rider)
+    gaps = order_gaps(logs)
+    gap_stats = gaps.groupby('Picker Name', observed=True)['gap_seconds'].describe(percentiles=[.5, .95])[['count', '50%', '95%']] if len(gaps) else pd.DataFrame()
+    return {'lines': len(logs), 'orders': logs['Order ID'].nunique() if len(logs) else 0, 'units': int(logs['Pick Qty'].sum()) if len(logs) else 0,
+            'per_picker': picks_per_hour(logs), 'hourly': hourly(logs), 'cycles': cycles, 'gaps': gap_stats,
+            'location_errors': location_error_rates(scans)}
+
+
+def location_error_rates(scans):
+    """Per expected Location: scans, wrong scans and error rate (worst first)."""
+    if scans.empty: return pd.DataFrame(columns=['location', 'scans', 'errors', 'error_rate'])
+    g = scans.groupby('location')['ok']
+    out = pd.DataFrame({'scans': g.size(), 'errors': g.size() - g.sum()})
+    out['error_rate'] = out['errors'] / out['scans']
+    return out.reset_index().sort_values(['error_rate', 'scans'], ascending=[False, False])
@@ -0,0 +1,78 @@
+"""Shared barcode decoding for every camera scan.
+
+Frames are converted to grayscale and decoded on a downscaled copy first;
+the full-resolution frame is only tried when that misses. Each field can
+restrict the symbologies zbar looks for, which also makes it faster.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from PIL import Image
+from pyzbar.pyzbar import ZBarSymbol, decode
+
+from picking.metrics import record
+
+DOWNSCALE_MAX_EDGE = 1280
+
+# ชนิด Barcode ที่ยอมรับต่อช่อง (None = ทุกชนิด)
+FIELD_SYMBOLS = {
+    'user': None,
+    'order': ['CODE128', 'CODE39', 'QRCODE'],
+    'product': ['EAN13', 'EAN8', 'UPCA', 'UPCE', 'CODE128'],
+    'location': ['CODE128', 'CODE39', 'QRCODE'],
+    'rider_order': ['CODE128', 'CODE39', 'QRCODE'],
+}
+
+DecodeResult = namedtuple("DecodeResult", ["text", "seconds", "pass_used"])
+
+
+class DecodeStats:
+    """Process-wide decode counters per field (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, field, seconds, pass_used):
+        with self._lock:
+            s = self._stats.setdefault(field, {'calls': 0, 'seconds': 0.0, 'small': 0, 'full': 0, 'miss': 0})
+            s['calls'] += 1; s['seconds'] += seconds; s[pass_used] += 1
+
+    def snapshot(self):
+        with self._lock: return {k: dict(v) for k, v in self._stats.items()}
+
+
+DECODE_STATS = DecodeStats()
+
+
+def _symbols(field):
+    names = FIELD_SYMBOLS.get(field)
+    if not names: return None
+    return [ZBarSymbol[n] for n in names]
+
+
+def decode_image(img, symbols=None, max_edge=DOWNSCALE_MAX_EDGE):
+    """Decode a PIL image; returns (text or None, pass_used)."""
+    gray = img if img.mode == 'L' else img.convert('L')
+    if max(gray.size) > max_edge:
+        small = gray.copy(); small.thumbnail((max_edge, max_edge))
+        res = decode(small, symbols=symbols)
+        if res: return res[0].data.decode("utf-8"), 'small'
+    res = decode(gray, symbols=symbols)
+    if res: return res[0].data.decode("utf-8"), 'full'
+    return None, 'miss'
+
+
+def decode_scan(file_obj, field=None, max_edge=DOWNSCALE_MAX_EDGE):
+    """Decode a camera upload for ``field`` ('order', 'product', ...) and record timing."""
+    t0 = time.perf_counter()
+    text, pass_used = decode_image(Image.open(file_obj), _symbols(field), max_edge)
+    dt = time.perf_counter() - t0
+    DECODE_STATS.record(field or 'any', dt, pass_used)
+    record(f"decode.{field or 'any'}", dt, pass_used=pass_used)
+    return DecodeResult(text, dt, pass_used)
+
+
+def decode_text(file_obj, field=None):
+    return decode_scan(file_obj, field).text
@@ -0,0 +1,78 @@
+"""File-backed store for photo bytes so session state only holds handles.
+
+Every capture is written once to ``root/<handle>``; Streamlit session state
+keeps the handle string, ``st.image`` reads the thumbnail straight from
+disk, and uploads stream from the file. Blobs are deleted when the gallery
+is cleared/reset, when the job that uploaded them completes, or by
+``evict_expired`` once older than ``ttl`` (abandoned sessions).
+"""
+import os
+import shutil
+import threading
+import time
+import uuid
+
+BLOB_TTL = 6 * 3600
+SWEEP_EVERY = 600
+
+
+class BlobStore:
+    def __init__(self, root, ttl=BLOB_TTL):
+        self.root = root; self.ttl = ttl
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def path(self, handle):
+        # handle เป็นชื่อไฟล์ที่เราสร้างเองเท่านั้น (กัน path traversal)
+        return os.path.join(self.root, os.path.basename(handle))
+
+    def put(self, data, suffix=".jpg"):
+        handle = f"{uuid.uuid4().hex}{suffix}"
+        tmp = self.path(handle) + ".part"
+        with open(tmp, "wb") as f: f.write(data)
+        os.replace(tmp, self.path(handle))
+        self.maybe_sweep()
+        return handle
+
+    def open(self, handle): return open(self.path(handle), "rb")
+
+    def read(self, handle):
+        with self.open(handle) as f: return f.read()
+
+    def size(self, handle):
+        try: return os.path.getsize(self.path(handle))
+        except OSError: return 0
+
+    def exists(self, handle): return bool(handle) and os.path.exists(self.path(handle))
+
+    def delete(self, *handles):
+        for h in handles:
+            if not h: continue
+            try: os.remove(self.path(h))
+            except FileNotFoundError: pass
+
+    def take(self, handle, dest_path):
+        """Move a blob out of the store (e.g. into the outbox spool)."""
+        shutil.move(self.path(handle), dest_path)
+        return dest_path
+
+    def evict_expired(self, now=None):
+        now = now or time.time(); removed = 0
+        for name in os.listdir(self.root):
+            p = os.path.join(self.root, name)
+            try:
+                if now - os.path.getmtime(p) > self.ttl: os.remove(p); removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def maybe_sweep(self):
+        with self._lock:
+            if time.time() - self._swept_at < SWEEP_EVERY: return
+            self._swept_at = time.time()
+        self.evict_expired()
+
+    def usage(self):
+        files = [os.path.join(self.root, n) for n in os.listdir(self.root)]
+        return len(files), sum(os.path.getsize(p) for p in files if os.path.exists(p))
@@ -0,0 +1,164 @@
+"""Barcode-indexed product catalog.
+
+Built once per sheet refresh and shared between sessions through
+``st.cache_resource`` so a barcode lookup is a dict hit instead of a scan
+over the whole sheet-0 DataFrame. Brand, variant, Zone and Location are
+kept as categorical columns (integer codes + one copy of each distinct
+string) rather than one Python string per SKU.
+"""
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from picking.locations import LocationIndex
+
+CatalogEntry = namedtuple("CatalogEntry", ["barcode", "brand", "variant", "zone", "location"])
+
+# ตำแหน่งคอลัมน์ชื่อสินค้าในชีท 0 (เหมือนที่หน้าแพ็คใช้ row.iloc[3] / row.iloc[5])
+BRAND_COL_POS = 3
+VARIANT_COL_POS = 5
+
+
+def location_sort_key(location):
+    """Walk order of a Location code: natural sort (``"2-1"`` before ``"10-1"``),
+    snake (serpentine) through aisles: the bay number runs up in even aisles
+    and down in odd ones, so the picker does not walk back to the aisle start."""
+    tokens = [t for t in re.split(r'(\d+)', str(location).strip().upper()) if t]
+    nums = [int(t) for t in tokens if t.isdigit()]
+    parts = tuple((0, int(t), '') if t.isdigit() else (1, 0, t) for t in tokens)
+    if len(nums) >= 2 and nums[0] % 2: return (nums[0], -nums[1], parts)
+    return (nums[0], nums[1], parts) if len(nums) >= 2 else (nums[0] if nums else -1, 0, parts)
+
+
+def _ranks(categories, key):
+    order = sorted(range(len(categories)), key=lambda i: key(categories[i]))
+    ranks = np.empty(len(categories) + 1, dtype=np.int64)
+    ranks[np.asarray(order, dtype=np.int64)] = np.arange(len(order))
+    ranks[-1] = len(order)  # code -1 (ว่าง) ไปท้ายสุด
+    return ranks
+
+
+class _Column:
+    """Read-only categorical column: ``codes[i]`` indexes ``categories``."""
+
+    def __init__(self, series):
+        cat = series.astype(str).astype('category') if not isinstance(series.dtype, pd.CategoricalDtype) else series
+        self.codes = cat.cat.codes.to_numpy().copy()
+        self.codes.flags.writeable = False
+        self.categories = tuple(str(c) for c in cat.cat.categories)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return self.categories[code] if code >= 0 else ''
+
+    def nbytes(self):
+        return self.codes.nbytes + sum(len(c) for c in self.categories)
+
+
+def _column(df, name=None, pos=None):
+    if name is not None:
+        return _Column(df[name]) if name in df.columns else None
+    if pos is not None and pos < len(df.columns):
+        return _Column(df.iloc[:, pos])
+    return None
+
+
+class Catalog:
+    """Read-only barcode -> (brand, variant, Zone, Location) index."""
+
+    def __init__(self, barcodes, brands, variants, zones, locations):
+        self._brands = brands
+        self._variants = variants
+        self._zones = zones
+        self._locations = locations
+        self._size = len(barcodes)
+        self._path_rank = None
+        self._locations_index = None
+        self._path_lock = threading.Lock()
+        # แถวแรกของ Barcode ที่ซ้ำกันชนะ (เหมือน match.iloc[0] เดิม)
+        self._index = {}
+        for i, b in enumerate(barcodes):
+            if b not in self._index: self._index[b] = i
+
+    @classmethod
+    def from_frame(cls, df):
+        if df is None or df.empty or 'Barcode' not in df.columns:
+            return cls([], None, None, None, None)
+        return cls(
+            [str(v) for v in df['Barcode'].tolist()],
+            _column(df, pos=BRAND_COL_POS),
+            _column(df, pos=VARIANT_COL_POS),
+            _column(df, name='Zone'),
+            _column(df, name='Location'),
+        )
+
+    def __len__(self): return self._size
+
+    def __contains__(self, barcode): return str(barcode) in self._index
+
+    @property
+    def empty(self): return not self._size
+
+    def lookup(self, barcode):
+        i = self._index.get(str(barcode))
+        if i is None: return None
+        return CatalogEntry(
+            str(barcode),
+            self._brands[i] if self._brands is not None else None,
+            self._variants[i] if self._variants is not None else None,
+            self._zones[i] if self._zones is not None else '',
+            self._locations[i] if self._locations is not None else '',
+        )
+
+    def rows(self, barcodes):
+        """Row numbers of ``barcodes`` (-1 where unknown) as an int array."""
+        return np.fromiter((self._index.get(str(b), -1) for b in barcodes), dtype=np.int64, count=len(barcodes))
+
+    def path_rank(self):
+        """Walk-order rank of every row (Zone, then Location snake order), computed
+        once per catalog from the categorical codes (one sort over the distinct
+        values, not over the SKUs)."""
+        if self._path_rank is None:
+            with self._path_lock:
+                if self._path_rank is None:
+                    n = self._size
+                    if self._zones is None or self._locations is None:
+                        rank = np.zeros(n, dtype=np.int64)
+                    else:
+                        zone_rank = _ranks(self._zones.categories, lambda z: (z.strip() == '', z.strip().upper()))
+                        loc_rank = _ranks(self._locations.categories, location_sort_key)
+                        width = len(self._locations.categories) + 1
+                        rank = zone_rank[self._zones.codes] * width + loc_rank[self._locations.codes]
+                    rank.flags.writeable = False
+                    self._path_rank = rank
+        return self._path_rank
+
+    def location_index(self):
+        """``LocationIndex`` over this catalog (built once, on first use)."""
+        if self._locations_index is None:
+            with self._path_lock:
+                if self._locations_index is None:
+                    empty = np.full(self._size, -1, dtype=np.int64)
+                    z, l = self._zones, self._locations
+                    barcodes = [None] * self._size
+                    for b, i in self._index.items(): barcodes[i] = b
+                    self._locations_index = LocationIndex(
+                        barcodes, self._index.get,
+                        z.codes if z is not None else empty, z.categories if z is not None else (),
+                        l.codes if l is not None else empty, l.categories if l is not None else ())
+        return self._locations_index
+
+    def column_nbytes(self):
+        return sum(c.nbytes() for c in (self._brands, self._variants, self._zones, self._locations) if c is not None)
+
+    @staticmethod
+    def display_name(entry):
+        if entry.brand is None or entry.variant is None: return "Error Name"
+        return f"{entry.brand} {entry.variant}"
+
+    @staticmethod
+    def target_location(entry):
+        return f"{entry.zone.strip()}-{entry.location.strip()}"
@@ -0,0 +1,100 @@
+"""Drive folder-ID cache for the YYYY / MM / DD-MM-YYYY folder tree.
+
+One ``FolderCache`` is shared by every session (``st.cache_resource``).
+Entries are keyed on ``(day, parent_id, name)`` for the Thai calendar day
+they were resolved on, so the tree walk costs Drive queries once per day
+instead of on every upload/lookup. Only the latest ``KEEP_DAYS`` days are
+kept; an outbox job confirmed before midnight and processed after it uses
+yesterday's entries without touching today's. Resolving the same key
+from several threads is single-flight: the first caller queries/creates,
+the rest wait and reuse its answer, so there is never a duplicate
+``DD-MM-YYYY`` folder at midnight.
+
+The cache also keeps an order_id -> (folder_id, folder_name) index of the
+order folders created/found today, so the rider hand-off can skip Drive
+entirely when the pack was uploaded from this process.
+"""
+import threading
+from datetime import datetime
+
+FOLDER_MIME = 'application/vnd.google-apps.folder'
+KEEP_DAYS = 2
+
+
+def find_folder(service, parent_id, name):
+    q = f"name = '{name}' and '{parent_id}' in parents and mimeType = '{FOLDER_MIME}' and trashed = false"
+    res = service.files().list(q=q, fields="files(id)").execute()
+    files = res.get('files', [])
+    return files[0]['id'] if files else None
+
+
+def create_folder(service, parent_id, name):
+    meta = {'name': name, 'parents': [parent_id], 'mimeType': FOLDER_MIME}
+    return service.files().create(body=meta, fields='id').execute().get('id')
+
+
+def _day_order(day):
+    try: return datetime.strptime(day, "%d-%m-%Y")
+    except (TypeError, ValueError): return datetime.min
+
+
+class FolderCache:
+    def __init__(self, keep_days=KEEP_DAYS):
+        self._ids = {}    # (day, parent_id, name) -> folder_id
+        self._locks = {}  # (parent_id, name) -> Lock สำหรับ single-flight (ไม่ล้างตอนขึ้นวันใหม่)
+        self._guard = threading.Lock()
+        self._orders = {}  # (day, order_id) -> (folder_id, folder_name)
+        self._days = set()
+        self.keep_days = keep_days
+        self.hits = 0; self.misses = 0; self.creates = 0
+
+    def _roll(self, day):
+        # วันใหม่ -> เก็บแค่ keep_days วันล่าสุด (Job ของเมื่อวานที่มาช้าไม่ล้างของวันนี้)
+        with self._guard:
+            if day in self._days: return
+            self._days.add(day)
+            if len(self._days) <= self.keep_days: return
+            keep = set(sorted(self._days, key=_day_order)[-self.keep_days:])
+            self._days = keep
+            self._ids = {k: v for k, v in self._ids.items() if k[0] in keep}
+            self._orders = {k: v for k, v in self._orders.items() if k[0] in keep}
+
+    def _lock_for(self, key):
+        with self._guard: return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, parent_id, name, day):
+        self._roll(day)
+        return self._ids.get((day, parent_id, name))
+
+    def put(self, parent_id, name, folder_id, day):
+        self._roll(day)
+        with self._guard: self._ids[(day, parent_id, name)] = folder_id
+
+    def resolve(self, service, parent_id, name, day, create=True):
+        """Folder ID of ``name`` under ``parent_id``; ``None`` if missing and ``create`` is False."""
+        key = (parent_id, name)
+        fid = self.get(parent_id, name, day)
+        if fid: self.hits += 1; return fid
+        with self._lock_for(key):
+            fid = self._ids.get((day,) + key)
+            if fid: self.hits += 1; return fid
+            self.misses += 1
+            fid = find_folder(service, parent_id, name)
+            if not fid and create:
+                fid = create_folder(service, parent_id, name); self.creates += 1
+            # ไม่ Cache ผลที่หาไม่เจอ เพราะเครื่องอื่นอาจสร้าง Folder ทีหลัง
+            if fid: self.put(parent_id, name, fid, day)
+            return fid
+
+    def put_order(self, order_id, folder_id, folder_name, day):
+        # Folder ที่สร้างทีหลังทับของเดิม (เหมือน orderBy createdTime desc)
+        self._roll(day)
+        with self._guard: self._orders[(day, order_id)] = (folder_id, folder_name)
+
+    def get_order(self, order_id, day):
+        self._roll(day)
+        return self._orders.get((day, order_id))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'creates': self.creates, 'entries': len(self._ids),
+                'orders': len(self._orders)}
@@ -0,0 +1,98 @@
+"""Drive photo uploads: simple uploads for small files and a bounded
+worker pool for the pack-confirmation gallery.
+
+The pool is created once per process and its threads live as long as the
+process, so each thread's keep-alive connection (``GoogleClients``'
+per-thread ``AuthorizedHttp``) is reused across orders."""
+import io
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from googleapiclient.http import MediaIoBaseUpload
+
+# ต่ำกว่านี้ใช้ simple upload (ไม่ต้องเปิด resumable session) — Drive รับ simple upload ได้ถึง 5 MB
+SIMPLE_UPLOAD_MAX_BYTES = 4 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+UPLOAD_WORKERS = 4
+
+GalleryUploadResult = namedtuple("GalleryUploadResult", ["file_ids", "latencies", "total"])
+
+_pools = {}  # max_workers -> ThreadPoolExecutor (ใช้ทั้ง Process ไม่สร้างใหม่ทุก Order)
+_pools_lock = threading.Lock()
+
+
+def upload_pool(max_workers=UPLOAD_WORKERS):
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None: pool = _pools[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="drive-upload")
+        return pool
+
+
+def _payload(file_obj):
+    if isinstance(file_obj, bytes): return io.BytesIO(file_obj), len(file_obj)
+    if hasattr(file_obj, 'getbuffer'): return file_obj, file_obj.getbuffer().nbytes
+    if isinstance(file_obj, io.BufferedReader): return file_obj, os.fstat(file_obj.fileno()).st_size
+    if hasattr(file_obj, 'size'): return file_obj, file_obj.size  # UploadedFile
+    return file_obj, None
+
+
+def make_media(file_obj, mimetype='image/jpeg', simple_max_bytes=SIMPLE_UPLOAD_MAX_BYTES):
+    body, size = _payload(file_obj)
+    resumable = size is None or size > simple_max_bytes
+    return MediaIoBaseUpload(body, mimetype=mimetype, chunksize=CHUNK_SIZE, resumable=resumable)
+
+
+def upload_bytes(service, file_obj, filename, folder_id, simple_max_bytes=SIMPLE_UPLOAD_MAX_BYTES):
+    """Upload bytes, a file object, or a file path (streamed from disk, not read into memory)."""
+    if isinstance(file_obj, (str, os.PathLike)):
+        with open(file_obj, 'rb') as f: return upload_bytes(service, f, filename, folder_id, simple_max_bytes)
+    file_metadata = {'name': filename, 'parents': [folder_id]}
+    media = make_media(file_obj, simple_max_bytes=simple_max_bytes)
+    return service.files().create(body=file_metadata, media_body=media, fields='id').execute().get('id')
+
+
+def list_files(service, folder_id):
+    """name -> file id of the (non-trashed) files in ``folder_id``."""
+    q = f"'{folder_id}' in parents and trashed = false"
+    out = {}; token = None
+    while True:
+        res = service.files().list(q=q, fields="nextPageToken, files(id, name)", pageToken=token).execute()
+        for f in res.get('files', []): out.setdefault(f['name'], f['id'])
+        token = res.get('nextPageToken')
+        if not token: return out
+
+
+def upload_gallery(service_factory, images, filenames, folder_id, max_workers=UPLOAD_WORKERS,
+                   simple_max_bytes=SIMPLE_UPLOAD_MAX_BYTES, on_uploaded=None):
+    """Upload ``images`` concurrently; ``file_ids`` keeps the gallery order.
+
+    ``service_factory`` is called once per worker thread and call; it must return a
+    service that is safe to use from that thread (a fresh one, or the
+    shared ``GoogleClients.drive()``). ``on_uploaded(i, file_id)`` is called
+    from the worker thread as each upload finishes. If any upload fails the
+    first error is re-raised after the others have finished.
+    """
+    local = threading.local()
+
+    def _one(i):
+        if getattr(local, 'service', None) is None: local.service = service_factory()
+        t0 = time.perf_counter()
+        fid = upload_bytes(local.service, images[i], filenames[i], folder_id, simple_max_bytes)
+        if on_uploaded: on_uploaded(i, fid)
+        return fid, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pool = upload_pool(max(1, max_workers))
+    futures = [pool.submit(_one, i) for i in range(len(images))]
+    wait(futures)
+    file_ids = []; latencies = []; error = None
+    for f in futures:
+        try: fid, dt = f.result()
+        except Exception as e:
+            error = error or e; fid, dt = None, None
+        file_ids.append(fid); latencies.append(dt)
+    if error is not None: raise error
+    return GalleryUploadResult(file_ids, latencies, time.perf_counter() - t0)
@@ -0,0 +1,147 @@
+"""Process-wide Google API clients.
+
+One ``GoogleClients`` (held in ``st.cache_resource``) owns the OAuth
+credentials, the gspread client, the opened spreadsheet and a single Drive
+v3 service for the whole process. The access token is refreshed only when
+it is missing or expired. httplib2 is not thread-safe, so the Drive
+service hands every thread its own keep-alive ``AuthorizedHttp`` through
+``requestBuilder`` instead of building a service per call/thread.
+
+Every Sheets and Drive request goes through the process-wide ``ApiGuard``
+(token buckets + retry/backoff, see ``picking.ratelimit``).
+"""
+import threading
+from functools import partial
+from urllib.parse import urlparse
+
+import gspread
+import httplib2
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+from gspread.http_client import HTTPClient
+
+from picking.ratelimit import ApiGuard
+
+HTTP_TIMEOUT = 60
+
+
+SHEETS_VERBS = ('append', 'batchGet', 'batchUpdate', 'batchClear', 'clear', 'copyTo')
+
+
+def sheets_op(endpoint):
+    """Span name for a Sheets request, e.g. ``sheets.values:append`` (ids/ranges stripped)."""
+    path = urlparse(str(endpoint)).path.split('/spreadsheets/', 1)[-1]
+    verb = path.rsplit(':', 1)[-1] if ':' in path else ''
+    head = path.split('/')[1] if '/' in path else 'spreadsheet'
+    if head.startswith('values'): head = 'values'
+    return f"sheets.{head}" + (f":{verb}" if verb in SHEETS_VERBS else '')
+
+
+class GuardedHTTPClient(HTTPClient):
+    """gspread HTTP client that rate-limits and retries through an ``ApiGuard``."""
+
+    def __init__(self, auth, session=None, guard=None):
+        super().__init__(auth, session)
+        self.guard = guard
+
+    def request(self, method, endpoint, *args, **kwargs):
+        api = 'sheets_read' if method.lower() == 'get' else 'sheets_write'
+        return self.guard.call(api, lambda: HTTPClient.request(self, method, endpoint, *args, **kwargs),
+                               op=sheets_op(endpoint), idempotent=method.lower() != 'post')
+
+
+class GuardedHttpRequest(HttpRequest):
+    """googleapiclient request whose ``execute`` goes through an ``ApiGuard``."""
+
+    guard = None
+
+    def execute(self, http=None, num_retries=0):
+        return self.guard.call('drive', lambda: HttpRequest.execute(self, http=http, num_retries=num_retries),
+                               op=self.methodId, idempotent=self.method != 'POST')
+
+
+class GoogleClients:
+    def __init__(self, credentials_factory, sheet_id, guard=None, drive_endpoint=None):
+        self.credentials_factory = credentials_factory
+        self.sheet_id = sheet_id
+        self.guard = guard or ApiGuard()
+        self.drive_endpoint = drive_endpoint  # ใช้กับ Fake API ตอนทดสอบ
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._creds = None
+        self._gc = None
+        self._spreadsheet = None
+        self._drive = None
+        self.counters = {'credentials_built': 0, 'token_refreshes': 0, 'gspread_clients': 0,
+                         'spreadsheet_opens': 0, 'drive_builds': 0, 'http_connections': 0}
+
+    def credentials(self):
+        """Shared credentials with a valid token, or ``None`` if none are configured."""
+        with self._lock:
+            if self._creds is None:
+                self._creds = self.credentials_factory()
+                if self._creds is None: return None
+                self.counters['credentials_built'] += 1
+            if not self._creds.valid:
+                self._creds.refresh(Request()); self.counters['token_refreshes'] += 1
+            return self._creds
+
+    def gspread_client(self):
+        creds = self.credentials()
+        if creds is None: return None
+        with self._lock:
+            if self._gc is None:
+                self._gc = gspread.authorize(creds, http_client=partial(GuardedHTTPClient, guard=self.guard))
+                self.counters['gspread_clients'] += 1
+            return self._gc
+
+    def spreadsheet(self):
+        gc = self.gspread_client()
+        if gc is None: return None
+        with self._lock:
+            if self._spreadsheet is None:
+                self._spreadsheet = gc.open_by_key(self.sheet_id); self.counters['spreadsheet_opens'] += 1
+            return self._spreadsheet
+
+    def _thread_http(self):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self._creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            self._local.http = http
+            with self._lock: self.counters['http_connections'] += 1
+        return http
+
+    def _build_request(self, http, postproc, uri, *args, **kwargs):
+        # ใช้ Http ของ Thread ปัจจุบันเสมอ (ไม่แชร์ Connection ข้าม Thread)
+        self.credentials()
+        if self.drive_endpoint:
+            # googleapiclient เปลี่ยนแค่ host ของ URL upload ไม่เปลี่ยน scheme
+            ep = urlparse(self.drive_endpoint)
+            uri = urlparse(uri)._replace(scheme=ep.scheme, netloc=ep.netloc).geturl()
+        req = GuardedHttpRequest(self._thread_http(), postproc, uri, *args, **kwargs)
+        req.guard = self.guard
+        return req
+
+    def drive(self):
+        """The shared Drive v3 service (safe to use from any thread)."""
+        if self.credentials() is None: return None
+        with self._lock:
+            if self._drive is None:
+                options = {'api_endpoint': self.drive_endpoint} if self.drive_endpoint else None
+                self._drive = build('drive', 'v3', http=self._thread_http(), requestBuilder=self._build_request,
+                                    cache_discovery=False, client_options=options)
+                self.counters['drive_builds'] += 1
+            return self._drive
+
+    def reset(self):
+        """Drop cached handles (e.g. after the spreadsheet was replaced); credentials are kept."""
+        with self._lock:
+            self._gc = None; self._spreadsheet = None; self._drive = None
+
+    def stats(self):
+        with self._lock: return dict(self.counters)
+
+    def api_metrics(self):
+        return self.guard.snapshot()
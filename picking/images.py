@@ -0,0 +1,43 @@
+"""Capture preprocessing: fix EXIF orientation, cap the long edge and
+re-encode as progressive JPEG before the photo is kept or uploaded, plus a
+small thumbnail for the on-screen gallery."""
+import io
+import time
+from collections import namedtuple
+
+from PIL import Image, ImageOps
+
+ImageSettings = namedtuple("ImageSettings", ["max_edge", "quality", "progressive", "thumb_edge", "thumb_quality"])
+DEFAULT_SETTINGS = ImageSettings(max_edge=1600, quality=80, progressive=True, thumb_edge=240, thumb_quality=70)
+
+ProcessedImage = namedtuple("ProcessedImage", ["data", "thumb", "size", "original_bytes", "encode_seconds"])
+
+
+def _read(file_obj):
+    if isinstance(file_obj, bytes): return file_obj
+    if hasattr(file_obj, 'getvalue'): return file_obj.getvalue()
+    return file_obj.read()
+
+
+def _encode(img, quality, progressive):
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=quality, optimize=True, progressive=progressive)
+    return buf.getvalue()
+
+
+def process_capture(file_obj, settings=DEFAULT_SETTINGS):
+    raw = _read(file_obj)
+    t0 = time.perf_counter()
+    img = Image.open(io.BytesIO(raw))
+    img = ImageOps.exif_transpose(img)  # รูปจากมือถือหมุนตาม EXIF ให้ถูกทิศก่อนตัด EXIF ทิ้ง
+    if img.mode != "RGB": img = img.convert("RGB")
+    if settings.max_edge and max(img.size) > settings.max_edge:
+        img.thumbnail((settings.max_edge, settings.max_edge), Image.LANCZOS)
+    data = _encode(img, settings.quality, settings.progressive)
+    thumb_img = img.copy(); thumb_img.thumbnail((settings.thumb_edge, settings.thumb_edge))
+    thumb = _encode(thumb_img, settings.thumb_quality, False)
+    return ProcessedImage(data, thumb, img.size, len(raw), time.perf_counter() - t0)
+
+
+def size_label(n):
+    return f"{n / 1024 / 1024:.1f}MB" if n >= 1024 * 1024 else f"{n / 1024:.0f}KB"
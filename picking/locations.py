@@ -0,0 +1,87 @@
+"""Location (bin) index, built once per catalog refresh.
+
+Bin codes are normalised to a canonical form (upper case, letters and
+numbers split on any separator, leading zeros dropped: ``"a 01/3"``,
+``"A-1-03"`` and ``"A1-3"`` are all ``A-1-3``). A scan is correct when it is
+the canonical ``Zone-Location`` of the product, or its ``Location`` part
+alone (bin labels that omit the zone), never a partial code such as ``"A"``.
+
+The index also answers the reverse question (which SKUs live at a bin)
+and prefix lookups (every bin in ``A-1``).
+"""
+import bisect
+import re
+from functools import lru_cache
+
+import numpy as np
+
+_TOKEN = re.compile(r'[A-Z]+|\d+')
+
+
+@lru_cache(maxsize=4096)
+def canonical_location(code):
+    return '-'.join(str(int(t)) if t.isdigit() else t for t in _TOKEN.findall(str(code).upper()))
+
+
+class LocationIndex:
+    """Canonical bin code -> barcodes, plus a per-row bin id for validation."""
+
+    def __init__(self, barcodes, row_of, zone_codes, zone_categories, loc_codes, loc_categories):
+        zone_canon = [canonical_location(z) for z in zone_categories] + ['']   # code -1 -> ''
+        loc_canon = [canonical_location(l) for l in loc_categories] + ['']
+        width = len(loc_canon)
+        zc = np.where(zone_codes < 0, len(zone_categories), zone_codes).astype(np.int64)
+        lc = np.where(loc_codes < 0, len(loc_categories), loc_codes).astype(np.int64)
+        # จับกลุ่มแถวตามคู่ (Zone, Location) ครั้งเดียวด้วย numpy แล้วแปลงเป็นรหัสมาตรฐานต่อกลุ่ม (ไม่ใช่ต่อแถว)
+        pairs, inverse = np.unique(zc * width + lc, return_inverse=True)
+        self._group_code = ['-'.join(p for p in (zone_canon[k // width], loc_canon[k % width]) if p) for k in pairs]
+        self._group_loc = [loc_canon[k % width] for k in pairs]
+        self._row_group = inverse.astype(np.int32); self._row_group.flags.writeable = False
+        self._row_of = row_of
+        order = np.argsort(inverse, kind='stable'); bounds = np.searchsorted(inverse[order], np.arange(len(pairs) + 1))
+        bins = {}; locs = {}
+        for g, code in enumerate(self._group_code):
+            if not code: continue
+            found = [barcodes[r] for r in order[bounds[g]:bounds[g + 1]]]
+            bins.setdefault(code, []).extend(found)
+            if self._group_loc[g]: locs.setdefault(self._group_loc[g], []).extend(found)
+        self._bins = {k: tuple(v) for k, v in bins.items()}
+        self._locs = {k: tuple(v) for k, v in locs.items()}
+        self._codes = sorted(self._bins)
+
+    def __len__(self): return len(self._codes)
+
+    def exact(self, code):
+        """Barcodes stored at bin ``code`` (any spelling), ``()`` if none."""
+        return self._bins.get(canonical_location(code), ())
+
+    def prefix(self, prefix, limit=None):
+        """Canonical bin codes starting with ``prefix`` (whole tokens: ``A-1`` matches ``A-1-3``, not ``A-10``)."""
+        p = canonical_location(prefix)
+        if not p: return []
+        i = bisect.bisect_left(self._codes, p); out = []
+        while i < len(self._codes) and self._codes[i].startswith(p):
+            code = self._codes[i]
+            if len(code) == len(p) or code[len(p)] == '-': out.append(code)
+            if limit and len(out) >= limit: break
+            i += 1
+        return out
+
+    def products_at(self, code):
+        """Reverse lookup: barcodes expected at the scanned bin (exact, else zone-less match)."""
+        return self.exact(code) or self._locs.get(canonical_location(code), ())
+
+    def _group(self, barcode):
+        row = self._row_of(str(barcode))
+        return None if row is None else int(self._row_group[row])
+
+    def target(self, barcode):
+        """Canonical ``Zone-Location`` of a barcode, or ``None``."""
+        g = self._group(barcode)
+        return None if g is None else self._group_code[g]
+
+    def matches(self, scanned, barcode):
+        g = self._group(barcode)
+        if g is None: return False
+        c = canonical_location(scanned)
+        return bool(c) and (c == self._group_code[g] or c == self._group_loc[g])
@@ -0,0 +1,161 @@
+"""Day/month partitions for the Logs / Rider_Logs sheets.
+
+Instead of appending forever to one ``Logs`` worksheet, each row goes to
+the partition that covers its timestamp:
+
+* ``target='worksheet'``: worksheet ``Logs_2026-10`` (or ``Logs_2026-10-18``)
+  in the main spreadsheet;
+* ``target='spreadsheet'``: worksheet ``Logs`` in a separate spreadsheet per
+  period, which also keeps the main file under the cell limit.
+
+Every partition is recorded in a manifest worksheet (``Log_Partitions``) in
+the main spreadsheet, so a date-range query (``read_range``) only opens the
+partitions that overlap the range. Routing a row (``route``) is pure; the
+manifest row / spreadsheet is created on the first write (``open``).
+"""
+import calendar
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+
+import pandas as pd
+
+from picking.sheet_sync import rows_to_frame
+
+GRANULARITIES = ('day', 'month')
+TARGETS = ('worksheet', 'spreadsheet')
+MANIFEST_SHEET = "Log_Partitions"
+MANIFEST_HEADERS = ["Base", "Partition", "Start", "End", "Spreadsheet ID", "Worksheet", "Created"]
+
+Partition = namedtuple("Partition", ["base", "key", "start", "end", "spreadsheet_id", "worksheet"])
+
+
+def to_date(value):
+    """``date`` from a date/datetime or a ``"YYYY-MM-DD[ HH:MM:SS]"`` / ``"DD-MM-YYYY"`` string."""
+    if isinstance(value, datetime): return value.date()
+    if isinstance(value, date): return value
+    s = str(value).strip()[:10]
+    if len(s) == 10 and s[2] == '-' and s[5] == '-': return datetime.strptime(s, "%d-%m-%Y").date()
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def period(day, granularity):
+    """(key, first day, last day) of the partition that holds ``day``."""
+    day = to_date(day)
+    if granularity == 'day': return day.isoformat(), day, day
+    last = calendar.monthrange(day.year, day.month)[1]
+    return day.strftime("%Y-%m"), day.replace(day=1), day.replace(day=last)
+
+
+class LogPartitions:
+    """Manifest-backed router for partitioned log sheets (one per process, thread-safe).
+
+    ``main_spreadsheet`` returns the main gspread Spreadsheet (manifest
+    lives there). For ``target='spreadsheet'`` pass ``create_spreadsheet(title)``
+    and ``open_spreadsheet(id)`` (e.g. ``gc.create`` / ``gc.open_by_key``).
+    """
+
+    def __init__(self, main_spreadsheet, granularity='month', target='worksheet', create_spreadsheet=None,
+                 open_spreadsheet=None, title_prefix=""):
+        if granularity not in GRANULARITIES: raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        if target not in TARGETS: raise ValueError(f"target must be one of {TARGETS}")
+        if target == 'spreadsheet' and not (create_spreadsheet and open_spreadsheet):
+            raise ValueError("target='spreadsheet' needs create_spreadsheet and open_spreadsheet")
+        self.main_spreadsheet = main_spreadsheet; self.granularity = granularity; self.target = target
+        self.create_spreadsheet = create_spreadsheet; self.open_spreadsheet = open_spreadsheet
+        self.title_prefix = title_prefix
+        self._lock = threading.RLock()
+        self._manifest = None   # (base, key) -> Partition
+        self._handles = {}      # spreadsheet id -> Spreadsheet
+        self.stats = {'manifest_loads': 0, 'created': 0, 'partitions_read': 0}
+
+    # --- routing ---
+    def route(self, base, timestamp):
+        """Partition for a row of ``base`` written at ``timestamp`` (no API calls)."""
+        key, start, end = period(timestamp, self.granularity)
+        known = (self._manifest or {}).get((base, key))
+        if known: return known
+        worksheet = base if self.target == 'spreadsheet' else f"{base}_{key}"
+        return Partition(base, key, start, end, "", worksheet)
+
+    def open(self, partition):
+        """Spreadsheet to append ``partition`` rows to; registers the partition on first use."""
+        partition = self.ensure(partition)
+        if not partition.spreadsheet_id: return self.main_spreadsheet()
+        with self._lock:
+            sh = self._handles.get(partition.spreadsheet_id)
+            if sh is None: sh = self._handles[partition.spreadsheet_id] = self.open_spreadsheet(partition.spreadsheet_id)
+            return sh
+
+    def ensure(self, partition):
+        with self._lock:
+            manifest = self._load()
+            known = manifest.get((partition.base, partition.key))
+            if known: return known
+            manifest = self._load(force=True)  # อาจมี Process อื่นสร้างไปแล้ว
+            known = manifest.get((partition.base, partition.key))
+            if known: return known
+            sid = ""
+            if self.target == 'spreadsheet':
+                sh = self.create_spreadsheet(f"{self.title_prefix}{partition.base} {partition.key}".strip())
+                sid = sh.id; self._handles[sid] = sh
+            partition = partition._replace(spreadsheet_id=sid)
+            self._manifest_ws().append_rows([[partition.base, partition.key, partition.start.isoformat(), partition.end.isoformat(),
+                                              sid, partition.worksheet, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")]])
+            manifest[(partition.base, partition.key)] = partition
+            self.stats['created'] += 1
+            return partition
+
+    # --- manifest ---
+    def _manifest_ws(self):
+        sh = self.main_spreadsheet()
+        try: return sh.worksheet(MANIFEST_SHEET)
+        except Exception:
+            ws = sh.add_worksheet(title=MANIFEST_SHEET, rows="100", cols=str(len(MANIFEST_HEADERS)))
+            ws.append_rows([MANIFEST_HEADERS])
+            return ws
+
+    def _load(self, force=False):
+        if self._manifest is not None and not force: return self._manifest
+        manifest = {}
+        for row in self._manifest_ws().get_all_values()[1:]:
+            row = list(row) + [""] * (len(MANIFEST_HEADERS) - len(row))
+            if not row[0] or not row[1]: continue
+            try: start, end = to_date(row[2]), to_date(row[3])
+            except ValueError: continue
+            # แถวแรกชนะ (ถ้าสอง Process สร้างซ้ำกัน)
+            manifest.setdefault((row[0], row[1]), Partition(row[0], row[1], start, end, row[4], row[5] or row[0]))
+        self._manifest = manifest; self.stats['manifest_loads'] += 1
+        return manifest
+
+    def partitions(self, base=None, refresh=False):
+        with self._lock: items = list(self._load(force=refresh).values())
+        return sorted((p for p in items if base is None or p.base == base), key=lambda p: (p.base, p.start))
+
+    def covering(self, base, start, end, refresh=False):
+        """Partitions of ``base`` that overlap ``[start, end]`` (dates, inclusive)."""
+        start, end = to_date(start), to_date(end)
+        return [p for p in self.partitions(base, refresh) if p.start <= end and p.end >= start]
+
+    # --- query ---
+    def read_range(self, base, start, end, include_legacy=False, timestamp_col=0):
+        """Rows of ``base`` with a timestamp in ``[start, end]`` as a DataFrame.
+
+        Only the covering partitions are read. ``include_legacy`` also scans the
+        old unpartitioned ``base`` worksheet (for ranges from before the switch).
+        """
+        start, end = to_date(start), to_date(end)
+        lo, hi = start.isoformat(), end.isoformat()
+        sources = [(self.open(p), p.worksheet) for p in self.covering(base, start, end)]
+        if include_legacy: sources.append((self.main_spreadsheet(), base))
+        headers = None; rows = []
+        for sh, title in sources:
+            try: values = sh.worksheet(title).get_all_values()
+            except Exception as e:
+                if type(e).__name__ == 'WorksheetNotFound': continue
+                raise
+            self.stats['partitions_read'] += 1
+            if not values: continue
+            headers = headers or values[0]
+            rows.extend(r for r in values[1:] if len(r) > timestamp_col and lo <= r[timestamp_col][:10] <= hi)
+        return rows_to_frame(headers, rows) if headers else pd.DataFrame()
@@ -0,0 +1,102 @@
+"""Lightweight timing spans for the pick/pack/rider flow.
+
+``span("drive.files.create", order_id=...)`` times a block and records it
+in the process-wide ``RECORDER`` (a bounded ring buffer), tagged with the
+session that was active (``session_scope``), so the admin page can show
+percentiles per process or per session. Spans can also be appended to a
+JSON-lines file (``PICKING_SPANS_JSONL``) to follow a whole shift.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 50_000
+
+_session = contextvars.ContextVar("picking_session", default=None)
+
+
+class SpanRecorder:
+    def __init__(self, maxlen=MAX_SPANS, sink_path=None):
+        self._spans = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.sink_path = sink_path
+
+    def record(self, name, seconds, ok=True, session=None, **attrs):
+        rec = {'ts': time.time(), 'name': name, 'seconds': round(seconds, 6), 'ok': ok,
+               'session': session if session is not None else _session.get()}
+        if attrs: rec['attrs'] = {k: v for k, v in attrs.items() if v is not None}
+        with self._lock:
+            self._spans.append(rec)
+            if self.sink_path:
+                try:
+                    with open(self.sink_path, 'a', encoding='utf-8') as f: f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                except OSError:
+                    pass
+        return rec
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the block; yields the attrs dict so results (rows, bytes, ...) can be added before it is recorded."""
+        t0 = time.perf_counter(); ok = True
+        try:
+            yield attrs
+        except BaseException:
+            ok = False; raise
+        finally:
+            self.record(name, time.perf_counter() - t0, ok, **attrs)
+
+    def spans(self, since=None, session=None, prefix=None):
+        with self._lock: items = list(self._spans)
+        return [s for s in items
+                if (since is None or s['ts'] >= since)
+                and (session is None or s['session'] == session)
+                and (prefix is None or s['name'].startswith(prefix))]
+
+    def summary(self, **filters):
+        """Per span name: count, errors, p50/p95/p99/max seconds (a pandas DataFrame)."""
+        import pandas as pd
+        rows = self.spans(**filters)
+        cols = ['name', 'count', 'errors', 'p50', 'p95', 'p99', 'max', 'total']
+        if not rows: return pd.DataFrame(columns=cols)
+        df = pd.DataFrame(rows)
+        g = df.groupby('name')['seconds']
+        out = pd.DataFrame({
+            'count': g.size(), 'errors': (~df['ok']).groupby(df['name']).sum(),
+            'p50': g.quantile(0.5), 'p95': g.quantile(0.95), 'p99': g.quantile(0.99), 'max': g.max(), 'total': g.sum(),
+        }).reset_index()
+        return out[cols].sort_values('total', ascending=False)
+
+    def to_jsonl(self, **filters):
+        return "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in self.spans(**filters))
+
+    def clear(self):
+        with self._lock: self._spans.clear()
+
+
+RECORDER = SpanRecorder(sink_path=os.environ.get('PICKING_SPANS_JSONL') or None)
+
+
+def span(name, **attrs): return RECORDER.span(name, **attrs)
+
+
+def record(name, seconds, ok=True, **attrs): return RECORDER.record(name, seconds, ok, **attrs)
+
+
+@contextmanager
+def session_scope(session_id):
+    """Tag spans recorded in this thread/context with ``session_id``."""
+    token = _session.set(session_id)
+    try: yield
+    finally: _session.reset(token)
+
+
+def set_session(session_id):
+    """Tag the rest of the current script run (Streamlit rerun) with ``session_id``."""
+    _session.set(session_id)
+
+
+def current_session(): return _session.get()
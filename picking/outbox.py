@@ -0,0 +1,238 @@
+"""Durable local outbox for Drive uploads and Sheets log writes.
+
+Confirming an order stores the job (JSON payload + photo bytes, or photo
+files moved into the outbox spool directory) in a SQLite file and returns
+straight away; ``OutboxWorker`` drains it in the
+background and retries failed jobs with exponential backoff. Jobs that
+were still running when the process died are picked up again on start.
+
+Each job also has a journal (``Journal``) of the remote steps it has
+finished (folder created, file uploaded, rows appended), written as soon
+as each call returns, so a retry resumes after the last completed step
+instead of redoing the whole job. ``enqueue(key=...)`` makes enqueueing
+idempotent: a second confirm with the same key returns the first job.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+
+MAX_ATTEMPTS = 8
+BASE_DELAY = 5.0     # วินาที, รอบถัดไป = BASE_DELAY * 2**attempts
+MAX_DELAY = 300.0
+KEEP_DONE_SECONDS = 24 * 3600
+
+Job = namedtuple("Job", ["id", "kind", "payload", "attempts"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_try REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_try);
+CREATE TABLE IF NOT EXISTS blobs (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS files (
+    job_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (job_id, step)
+);
+CREATE TABLE IF NOT EXISTS job_keys (
+    key TEXT PRIMARY KEY,
+    job_id INTEGER NOT NULL
+);
+"""
+
+
+class Outbox:
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.path = path
+        self.max_attempts = max_attempts; self.base_delay = base_delay; self.max_delay = max_delay
+        self.wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self.spool_dir = os.path.join(os.path.dirname(path) or '.', 'spool')
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            # งานที่ค้างสถานะ running ตอน Process ตาย -> กลับไปรอส่งใหม่
+            db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db: yield db
+        finally:
+            db.close()
+
+    def enqueue(self, kind, payload, blobs=(), files=(), key=None):
+        """Queue a job. ``blobs`` are bytes stored in the DB; ``files`` are paths
+        that are moved into the spool directory (attachments keep that order:
+        blobs first, then files). If a job with the same ``key`` exists its id
+        is returned and nothing is queued or moved."""
+        now = time.time()
+        with self._lock, self._connect() as db:
+            if key is not None:
+                row = db.execute("SELECT job_id FROM job_keys WHERE key = ?", (key,)).fetchone()
+                if row: return row[0]
+            cur = db.execute("INSERT INTO jobs (kind, payload, created, updated) VALUES (?, ?, ?, ?)",
+                             (kind, json.dumps(payload, ensure_ascii=False), now, now))
+            job_id = cur.lastrowid
+            db.executemany("INSERT INTO blobs (job_id, seq, data) VALUES (?, ?, ?)",
+                           [(job_id, i, sqlite3.Binary(b)) for i, b in enumerate(blobs)])
+            rows = []
+            for i, src in enumerate(files, start=len(blobs)):
+                dest = os.path.join(self.spool_dir, f"job{job_id}_{i}{os.path.splitext(src)[1]}")
+                shutil.move(src, dest); rows.append((job_id, i, dest))
+            db.executemany("INSERT INTO files (job_id, seq, path) VALUES (?, ?, ?)", rows)
+            if key is not None: db.execute("INSERT INTO job_keys (key, job_id) VALUES (?, ?)", (key, job_id))
+        self.wakeup.set()
+        return job_id
+
+    def claim(self):
+        """Mark the oldest due pending job as running and return it (or ``None``)."""
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT id, kind, payload, attempts FROM jobs WHERE status = 'pending' AND next_try <= ? "
+                             "ORDER BY id LIMIT 1", (time.time(),)).fetchone()
+            if not row: return None
+            db.execute("UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (time.time(), row[0]))
+        return Job(row[0], row[1], json.loads(row[2]), row[3])
+
+    def blobs(self, job_id):
+        """Attachments in order: ``bytes`` for DB blobs, a file path for spooled files."""
+        with self._connect() as db:
+            items = [(r[0], bytes(r[1])) for r in db.execute("SELECT seq, data FROM blobs WHERE job_id = ?", (job_id,))]
+            items += list(db.execute("SELECT seq, path FROM files WHERE job_id = ?", (job_id,)))
+        return [v for _, v in sorted(items, key=lambda x: x[0])]
+
+    def complete(self, job_id):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'done', last_error = NULL, updated = ? WHERE id = ?", (now, job_id))
+            db.execute("DELETE FROM blobs WHERE job_id = ?", (job_id,))
+            for (f,) in db.execute("SELECT path FROM files WHERE job_id = ?", (job_id,)).fetchall():
+                try: os.remove(f)
+                except FileNotFoundError: pass
+            db.execute("DELETE FROM files WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM steps WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM jobs WHERE status = 'done' AND updated < ?", (now - KEEP_DONE_SECONDS,))
+            db.execute("DELETE FROM job_keys WHERE job_id NOT IN (SELECT id FROM jobs)")
+
+    def journal(self, job_id):
+        with self._connect() as db:
+            rows = db.execute("SELECT step, value FROM steps WHERE job_id = ?", (job_id,)).fetchall()
+        return Journal(self, job_id, {k: json.loads(v) for k, v in rows})
+
+    def record_step(self, job_id, step, value):
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO steps (job_id, step, value) VALUES (?, ?, ?)",
+                       (job_id, step, json.dumps(value, ensure_ascii=False)))
+
+    def fail(self, job_id, error):
+        """Schedule a retry with backoff, or park the job as failed after ``max_attempts``."""
+        with self._lock, self._connect() as db:
+            attempts = db.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0] + 1
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            db.execute("UPDATE jobs SET status = ?, attempts = ?, next_try = ?, last_error = ?, updated = ? WHERE id = ?",
+                       (status, attempts, time.time() + delay, str(error)[:500], time.time(), job_id))
+        return status
+
+    def requeue(self, job_id):
+        with self._lock, self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'pending', attempts = 0, next_try = 0, updated = ? "
+                       "WHERE id = ? AND status = 'failed'", (time.time(), job_id))
+        self.wakeup.set()
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {'pending': 0, 'running': 0, 'failed': 0, 'done': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def jobs(self, status, limit=20):
+        with self._connect() as db:
+            rows = db.execute("SELECT id, kind, payload, attempts, last_error, created FROM jobs WHERE status = ? "
+                              "ORDER BY id LIMIT ?", (status, limit)).fetchall()
+        return [{'id': r[0], 'kind': r[1], 'payload': json.loads(r[2]), 'attempts': r[3],
+                 'last_error': r[4], 'created': r[5]} for r in rows]
+
+    def open_jobs(self, kind, order_id):
+        """Ids of ``kind`` jobs for ``order_id`` that are not done yet (pending, running or failed)."""
+        with self._connect() as db:
+            rows = db.execute("SELECT id FROM jobs WHERE kind = ? AND status != 'done' "
+                              "AND json_extract(payload, '$.order_id') = ? ORDER BY id", (kind, order_id)).fetchall()
+        return [r[0] for r in rows]
+
+
+class Journal:
+    """Steps a job has already completed (step name -> JSON value), kept across retries."""
+
+    def __init__(self, outbox, job_id, steps):
+        self.outbox = outbox; self.job_id = job_id; self.steps = steps
+
+    def __contains__(self, step): return step in self.steps
+
+    def get(self, step, default=None): return self.steps.get(step, default)
+
+    def put(self, step, value):
+        # บันทึกลง SQLite ทันทีที่ API call สำเร็จ (ก่อนทำขั้นถัดไป)
+        self.outbox.record_step(self.job_id, step, value); self.steps[step] = value
+        return value
+
+
+class OutboxWorker(threading.Thread):
+    """Drains an ``Outbox``; ``handlers`` maps job kind -> fn(job, blobs, journal)."""
+
+    def __init__(self, outbox, handlers, poll_interval=2.0):
+        super().__init__(name="outbox-worker", daemon=True)
+        self.outbox = outbox; self.handlers = handlers; self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set(); self.outbox.wakeup.set()
+
+    def run_once(self):
+        job = self.outbox.claim()
+        if job is None: return False
+        try:
+            handler = self.handlers[job.kind]
+            handler(job, self.outbox.blobs(job.id), self.outbox.journal(job.id))
+        except Exception as e:
+            status = self.outbox.fail(job.id, f"{type(e).__name__}: {e}")
+            print(f"❌ OUTBOX job {job.id} ({job.kind}) -> {status}: {e}")
+            traceback.print_exc()
+        else:
+            self.outbox.complete(job.id)
+        return True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.run_once(): continue
+            self.outbox.wakeup.wait(self.poll_interval)
+            self.outbox.wakeup.clear()
@@ -0,0 +1,159 @@
+"""Shared token-bucket rate limiting and retry/backoff for Google API calls.
+
+One ``ApiGuard`` per process (owned by ``GoogleClients``) is used by every
+session and background thread, so the per-minute quotas are respected by
+the process as a whole. Retryable failures (429, 408, 5xx, Drive 403
+rate-limit reasons and connection errors) are retried with exponential
+backoff and full jitter; ``Retry-After`` is honoured when present.
+
+Writes that are not idempotent (POST: folder/file create, ``values:append``)
+are only retried on 429 / 403 rate-limit responses, which Google rejects
+before doing anything. A 5xx or timeout may already have been applied, so
+those are raised to the caller (the outbox journal decides what to redo).
+"""
+import random
+import socket
+import threading
+import time
+
+from picking.metrics import span
+
+# ต่อ User ต่อนาที (ทั้งแอปใช้ OAuth User เดียวกัน)
+QUOTAS_PER_MINUTE = {
+    'sheets_read': 60,
+    'sheets_write': 60,
+    'drive': 600,
+}
+BURST = {'sheets_read': 10, 'sheets_write': 10, 'drive': 20}
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 32.0
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded', 'usageLimits', 'quotaExceeded')
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait); waited += wait
+
+
+def error_status(exc):
+    """HTTP status of a googleapiclient ``HttpError`` / gspread ``APIError`` (else ``None``)."""
+    resp = getattr(exc, 'resp', None)
+    if resp is not None and getattr(resp, 'status', None) is not None: return int(resp.status)
+    response = getattr(exc, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) is not None: return int(response.status_code)
+    return None
+
+
+def _error_text(exc):
+    content = getattr(exc, 'content', None)
+    if isinstance(content, bytes): return content.decode('utf-8', 'replace')
+    response = getattr(exc, 'response', None)
+    if response is not None and hasattr(response, 'text'): return response.text
+    return str(exc)
+
+
+def is_rate_limited(exc):
+    status = error_status(exc)
+    return status == 429 or (status == 403 and any(r in _error_text(exc) for r in RATE_LIMIT_REASONS))
+
+
+def is_retryable(exc, idempotent=True):
+    if not idempotent: return is_rate_limited(exc)
+    status = error_status(exc)
+    if status is None:
+        return isinstance(exc, (ConnectionError, TimeoutError, socket.timeout)) or \
+            type(exc).__name__ in ('ServerNotFoundError', 'ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout')
+    return status in RETRY_STATUS or is_rate_limited(exc)
+
+
+def retry_after(exc):
+    resp = getattr(exc, 'resp', None)
+    headers = resp if resp is not None and hasattr(resp, 'get') else getattr(getattr(exc, 'response', None), 'headers', None)
+    try: return float(headers.get('retry-after') or headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError): return None
+
+
+class ApiGuard:
+    def __init__(self, quotas=None, burst=None, max_attempts=MAX_ATTEMPTS, base=BACKOFF_BASE, cap=BACKOFF_CAP,
+                 sleep=time.sleep):
+        quotas = dict(QUOTAS_PER_MINUTE, **(quotas or {})); burst = dict(BURST, **(burst or {}))
+        self.buckets = {k: TokenBucket(v, burst.get(k, 1)) for k, v in quotas.items()}
+        self.max_attempts = max_attempts; self.base = base; self.cap = cap; self._sleep = sleep
+        self._lock = threading.Lock()
+        self.metrics = {}
+
+    def _count(self, api, key, n=1):
+        with self._lock:
+            m = self.metrics.setdefault(api, {'calls': 0, 'throttled': 0, 'throttle_wait_s': 0.0, 'retries': 0,
+                                              'retried_calls': 0, 'gave_up': 0, 'errors': {}})
+            if key == 'error': m['errors'][n] = m['errors'].get(n, 0) + 1
+            else: m[key] += n
+
+    def backoff(self, attempt, exc=None):
+        hint = retry_after(exc) if exc is not None else None
+        if hint is not None: return min(self.cap, hint)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    def call(self, api, fn, op=None, idempotent=True):
+        """Run ``fn()`` under the ``api`` bucket, retrying retryable errors
+        (only rate-limit rejections when ``idempotent`` is False).
+
+        The whole call (throttle wait + retries) is recorded as span ``api.<op or api>``;
+        retried calls also carry ``retries``, ``retry_errors`` and ``backoff_s``.
+        """
+        with span(f"api.{op or api}") as attrs:
+            return self._call(api, fn, idempotent, attrs)
+
+    def _call(self, api, fn, idempotent=True, attrs=None):
+        bucket = self.buckets.get(api)
+        self._count(api, 'calls')
+        attempt = 0
+        while True:
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited:
+                    self._count(api, 'throttled'); self._count(api, 'throttle_wait_s', waited)
+            try:
+                return fn()
+            except Exception as e:
+                status = error_status(e)
+                self._count(api, 'error', status if status is not None else type(e).__name__)
+                attempt += 1; retryable = is_retryable(e, idempotent)
+                if not retryable or attempt >= self.max_attempts:
+                    if attempt > 1 or retryable: self._count(api, 'gave_up')
+                    raise
+                if attempt == 1: self._count(api, 'retried_calls')
+                self._count(api, 'retries')
+                delay = self.backoff(attempt - 1, e)
+                if attrs is not None:
+                    # ลง span ของ Call นี้ (ดูในหน้า Admin / metrics sink) แทน print ทุกรอบ
+                    attrs['retries'] = attempt
+                    attrs.setdefault('retry_errors', []).append(status if status is not None else type(e).__name__)
+                    attrs['backoff_s'] = round(attrs.get('backoff_s', 0.0) + delay, 3)
+                self._sleep(delay)
+
+    def snapshot(self):
+        with self._lock:
+            return {k: dict(v, errors=dict(v['errors'])) for k, v in self.metrics.items()}
@@ -0,0 +1,78 @@
+"""Batched writes to the Logs / Rider_Logs worksheets.
+
+All rows queued in a ``LogBatch`` are written with a single ``append_rows``
+per worksheet, over one spreadsheet handle, instead of one
+authorize/open/worksheet/append_row round trip per basket item.
+"""
+from collections import OrderedDict, namedtuple
+
+LOG_HEADERS = ["Timestamp", "Picker Name", "Order ID", "Barcode", "Product Name", "Location", "Pick Qty", "User", "Image Link (Col I)"]
+RIDER_HEADERS = ["Timestamp", "User Name", "Order ID", "Folder Name", "Rider Image Link"]
+
+# ขนาดชีทตอนสร้างใหม่ (เหมือน add_worksheet เดิม)
+SHEET_COLS = {"Logs": "20", "Rider_Logs": "10"}
+
+FlushResult = namedtuple("FlushResult", ["orders", "rows", "api_calls"])
+
+
+def image_link(file_id): return f"https://drive.google.com/open?id={file_id}"
+
+
+def pick_log_row(timestamp, picker_name, order_id, barcode, prod_name, location, pick_qty, user_col, file_id):
+    return [timestamp, picker_name, order_id, barcode, prod_name, location, pick_qty, user_col, image_link(file_id)]
+
+
+def rider_log_row(timestamp, picker_name, order_id, folder_name, file_id):
+    return [timestamp, picker_name, order_id, folder_name, image_link(file_id)]
+
+
+class LogBatch:
+    """Rows for one or more orders, grouped per worksheet until ``flush``."""
+
+    def __init__(self):
+        self._rows = OrderedDict()  # sheet_name -> [row, ...]
+        self._headers = {}
+        self._orders = []
+
+    def add(self, sheet_name, row, headers=None, order_id=None):
+        self._rows.setdefault(sheet_name, []).append(list(row))
+        if headers: self._headers[sheet_name] = list(headers)
+        if order_id is not None and order_id not in self._orders: self._orders.append(order_id)
+
+    def add_order(self, sheet_name, order_id, rows, headers=None):
+        for r in rows: self.add(sheet_name, r, headers=headers, order_id=order_id)
+
+    def extend(self, other):
+        for sheet_name, rows in other._rows.items():
+            self._rows.setdefault(sheet_name, []).extend(rows)
+        self._headers.update(other._headers)
+        for o in other._orders:
+            if o not in self._orders: self._orders.append(o)
+
+    @property
+    def orders(self): return list(self._orders)
+
+    def __len__(self): return sum(len(r) for r in self._rows.values())
+
+    def flush(self, spreadsheet):
+        """Write every queued row; ``spreadsheet`` is an open gspread Spreadsheet.
+
+        Returns a ``FlushResult`` whose ``api_calls`` counts the worksheet
+        lookups, sheet creation and appends made here (opening the
+        spreadsheet is the caller's one extra call).
+        """
+        calls = 0; rows_written = 0
+        for sheet_name, rows in self._rows.items():
+            if not rows: continue
+            calls += 1
+            try: worksheet = spreadsheet.worksheet(sheet_name)
+            except Exception:
+                headers = self._headers.get(sheet_name)
+                cols = SHEET_COLS.get(sheet_name) or (str(len(headers)) if headers else "20")  # Partition ใช้จำนวนคอลัมน์ตาม Header
+                worksheet = spreadsheet.add_worksheet(title=sheet_name, rows="1000", cols=cols); calls += 1
+                if headers: worksheet.append_rows([headers] + rows); calls += 1; rows_written += len(rows); continue
+            worksheet.append_rows(rows); calls += 1
+            rows_written += len(rows)
+        result = FlushResult(len(self._orders), rows_written, calls)
+        self._rows.clear(); self._orders = []
+        return result
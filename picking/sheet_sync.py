@@ -0,0 +1,185 @@
+"""Stale-while-revalidate, incremental cache of a worksheet as a DataFrame.
+
+``SheetSync.get()`` always answers from memory once the first load is done.
+When the data is older than ``ttl`` a background thread refreshes it:
+
+* sheets of up to ``full_below`` rows are simply reloaded in full;
+* larger sheets first read the key column (``A:A``, one narrow read).
+  If it still starts with the keys seen last time, only the rows below
+  the last known row are fetched (``worksheet.get('A{n+1}:{last col}')``)
+  and appended, with the barcode/ID clean-up run on the new rows only.
+  A deleted, inserted or re-keyed row means a full reload;
+* a full ``get_all_values()`` also happens on the first load, every
+  ``full_every`` seconds (to pick up edits in the other columns), or when
+  the optional ``version_cell`` changes.
+"""
+import re
+import threading
+import time
+import traceback
+
+import pandas as pd
+from gspread.utils import rowcol_to_a1
+
+from picking.metrics import span
+
+TTL = 600
+FULL_RELOAD_EVERY = 3600
+# ชีทเล็ก (เช่น User) โหลดใหม่ทั้งชีททุก TTL: ถูกพอๆ กับเช็ค แล้วเห็นทุกการแก้ไข/ลบ
+FULL_BELOW_ROWS = 2000
+# คอลัมน์ที่ค่าไม่ซ้ำไม่เกินสัดส่วนนี้ของจำนวนแถว -> เก็บเป็น category (Zone, Location, Brand, ...)
+CATEGORY_MAX_RATIO = 0.5
+
+
+def clean_frame(df):
+    """Same clean-up as the old ``load_sheet_data``: strip headers, drop a
+    trailing ``.0`` from barcode/ID columns, normalise the Barcode header."""
+    df.columns = df.columns.str.strip()
+    for col in df.columns:
+        if 'barcode' in col.lower() or 'id' in col.lower():
+            df[col] = df[col].astype(str).str.replace(r'\.0$', '', regex=True)
+    if 'Barcode' not in df.columns:
+        for col in df.columns:
+            if col.lower() == 'barcode':
+                df.rename(columns={col: 'Barcode'}, inplace=True); break
+    return df
+
+
+def compact_frame(df, max_ratio=CATEGORY_MAX_RATIO):
+    """Store repetitive text columns as ``category`` (codes + one copy of
+    each distinct string). Barcode/ID columns are unique keys and stay as-is."""
+    n = len(df)
+    if n < 2: return df
+    for i, col in enumerate(df.columns):
+        s = df.iloc[:, i]
+        if isinstance(s.dtype, pd.CategoricalDtype): continue
+        if 'barcode' in str(col).lower() or 'id' in str(col).lower(): continue
+        if s.nunique(dropna=False) <= max_ratio * n: df.isetitem(i, s.astype('category'))
+    return df
+
+
+def rows_to_frame(headers, rows):
+    width = len(headers)
+    # Sheets API ตัดช่องว่างท้ายแถวทิ้ง -> เติมให้ครบทุกคอลัมน์
+    rows = [list(r[:width]) + [''] * (width - len(r)) for r in rows]
+    return clean_frame(pd.DataFrame(rows, columns=headers))
+
+
+def _last_col_letter(width):
+    return re.sub(r'\d+', '', rowcol_to_a1(1, max(width, 1)))
+
+
+def _trim(keys):
+    # Sheets API ไม่ส่งแถวว่างท้ายคอลัมน์มา -> ตัดให้เทียบกันได้
+    while keys and not keys[-1]: keys.pop()
+    return keys
+
+
+def _key_column(rows):
+    return _trim([str(r[0]) if r else '' for r in rows])
+
+
+class SheetSync:
+    def __init__(self, open_worksheet, ttl=TTL, full_every=FULL_RELOAD_EVERY, version_cell=None, name="", compact=True,
+                 full_below=FULL_BELOW_ROWS):
+        self.open_worksheet = open_worksheet; self.compact = compact
+        self.ttl = ttl; self.full_every = full_every; self.version_cell = version_cell; self.name = name
+        self.full_below = full_below
+        self.generation = 0          # เพิ่มทุกครั้งที่ข้อมูลเปลี่ยน (ใช้เป็น Key ของ Cache ที่ derive จากตารางนี้)
+        self._df = None
+        self._headers = None
+        self._n_rows = 0             # จำนวนแถวในชีท รวม Header
+        self._keys = []              # คอลัมน์ A ตอนโหลดล่าสุด (เช็คว่าแถวเดิมถูกลบ/แทรก/แก้ Key ไหม)
+        self._version = None
+        self._checked_at = 0.0
+        self._full_at = 0.0
+        self._lock = threading.Lock()       # กันไม่ให้ Refresh ซ้อนกัน (ถือไว้ตลอดการโหลด)
+        self._flag_lock = threading.Lock()  # แค่ตั้ง _refreshing: ผู้อ่านไม่ต้องรอ _lock ระหว่างโหลด
+        self._refreshing = False
+        self.stats = {'full': 0, 'incremental': 0, 'unchanged': 0, 'changed': 0, 'errors': 0}
+
+    def get(self):
+        """Current table; never waits for a refresh once something is loaded.
+
+        The same frame is handed to every session: treat it as read-only (or
+        take ``view()``, which is copy-on-write)."""
+        if self._df is None:
+            with self._lock:
+                if self._df is None: self._refresh_locked()
+            return self._df if self._df is not None else pd.DataFrame()
+        if time.time() - self._checked_at > self.ttl: self.refresh_async()
+        return self._df
+
+    def view(self):
+        # Shallow copy: ไม่ Copy ข้อมูล, ถ้า Session ไหนแก้ไข pandas (Copy-on-Write) จะ Copy เฉพาะส่วนนั้นเอง
+        return self.get().copy(deep=False)
+
+    def refresh_async(self):
+        with self._flag_lock:
+            if self._refreshing: return
+            self._refreshing = True
+            self._checked_at = time.time()  # ผู้อ่านคนถัดไปได้ตารางเดิมทันที ไม่เรียกซ้ำ
+        threading.Thread(target=self._background_refresh, name=f"sheet-sync-{self.name}", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock: self._refresh_locked()
+        finally:
+            with self._flag_lock: self._refreshing = False
+
+    def refresh(self):
+        with self._lock: self._refresh_locked()
+        return self._df
+
+    def _refresh_locked(self):
+        try:
+            with span(f"sheet_sync.{self.name}"):
+                ws = self.open_worksheet()
+                version = ws.acell(self.version_cell).value if self.version_cell else None
+                full_due = (self._df is None or self._n_rows <= self.full_below or time.time() - self._full_at > self.full_every
+                            or (self.version_cell and version != self._version))
+                if full_due: self._full_load(ws)
+                else: self._tail_load(ws)
+                self._version = version
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"❌ SHEET SYNC ERROR ({self.name}): {e}")
+            traceback.print_exc()
+        finally:
+            # ถ้า Error ก็รอ TTL รอบหน้า (ยกเว้นยังไม่เคยโหลดได้เลย -> ลองใหม่ครั้งถัดไป)
+            if self._df is not None: self._checked_at = time.time()
+
+    def _full_load(self, ws):
+        rows = ws.get_all_values()
+        self.stats['full'] += 1
+        self._full_at = time.time()
+        self._keys = _key_column(rows)
+        if len(rows) > 1:
+            self._headers = rows[0]
+            self._set(rows_to_frame(rows[0], rows[1:]), len(rows))
+        else:
+            self._headers = rows[0] if rows else None
+            self._set(pd.DataFrame(), len(rows))
+
+    def _tail_load(self, ws):
+        if not self._headers: return self._full_load(ws)
+        keys = _key_column(ws.get("A:A"))
+        if keys[:len(self._keys)] != self._keys:
+            # แถวเดิมถูกลบ/แทรก/แก้ Key -> ตำแหน่งแถวเลื่อน ดึงต่อท้ายไม่ได้
+            self.stats['changed'] += 1; return self._full_load(ws)
+        if len(keys) == len(self._keys) and len(self._keys) >= self._n_rows:
+            self.stats['unchanged'] += 1; return
+        start = self._n_rows + 1
+        rng = f"A{start}:{_last_col_letter(len(self._headers))}"
+        new_rows = list(ws.get(rng))
+        if not new_rows:
+            self.stats['unchanged'] += 1; return
+        self.stats['incremental'] += 1
+        self._keys = _trim(self._keys + [''] * (self._n_rows - len(self._keys)) + [str(r[0]) if r else '' for r in new_rows])
+        delta = rows_to_frame(self._headers, new_rows)
+        merged = delta if self._df is None or self._df.empty else pd.concat([self._df, delta], ignore_index=True)
+        self._set(merged, self._n_rows + len(new_rows))
+
+    def _set(self, df, n_rows):
+        if self.compact: df = compact_frame(df)
+        self._df = df; self._n_rows = n_rows; self.generation += 1
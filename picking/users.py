@@ -0,0 +1,53 @@
+"""Employee ID -> (password digest, name) index for the login page.
+
+Built once per User-sheet refresh and shared between sessions through
+``st.cache_resource``, so a login is a dict hit instead of re-casting and
+scanning the whole sheet. Passwords are only kept as salted HMAC-SHA256
+digests (the salt is random per process) and checked with
+``hmac.compare_digest``; the plaintext never reaches session state.
+"""
+import hashlib
+import hmac
+import os
+from collections import namedtuple
+
+UserEntry = namedtuple("UserEntry", ["id", "digest", "name"])
+
+# ตำแหน่งคอลัมน์ในชีท User: รหัสพนักงาน, รหัสผ่าน, ชื่อ
+ID_COL_POS = 0
+PASSWORD_COL_POS = 1
+NAME_COL_POS = 2
+
+_SALT = os.urandom(16)
+
+
+def password_digest(password, salt=_SALT):
+    return hmac.new(salt, str(password).strip().encode('utf-8'), hashlib.sha256).digest()
+
+
+class UserIndex:
+    def __init__(self, users, salt=_SALT):
+        """``users``: iterable of (id, password, name); the first row of a duplicated ID wins (like the old scan)."""
+        self._salt = salt
+        self._users = {}
+        for uid, password, name in users:
+            uid = str(uid).strip()
+            if uid and uid not in self._users: self._users[uid] = UserEntry(uid, password_digest(password, salt), name)
+
+    @classmethod
+    def from_frame(cls, df, salt=_SALT):
+        if df is None or df.empty or len(df.columns) <= NAME_COL_POS: return cls((), salt)
+        cols = [df.iloc[:, i].astype(str).tolist() for i in (ID_COL_POS, PASSWORD_COL_POS, NAME_COL_POS)]
+        return cls(zip(*cols), salt)
+
+    def __len__(self): return len(self._users)
+
+    def lookup(self, user_id):
+        """``UserEntry`` for a typed/scanned ID, or ``None``."""
+        return self._users.get(str(user_id).strip())
+
+    def check(self, user_id, password):
+        """Constant-time password check; ``False`` for unknown IDs."""
+        entry = self.lookup(user_id)
+        given = password_digest(password, self._salt)
+        return hmac.compare_digest(given, entry.digest) if entry else False
@@ -0,0 +1,73 @@
+"""Wave (batch) picking: several orders picked in one walk.
+
+The lines of every order in the wave are grouped by barcode (one stop per
+SKU, with how many go to each order), sorted along the pick path using the
+catalog's precomputed ``path_rank`` (Zone, then Location in snake order),
+and after picking split back per order in the same basket format as the
+single-order flow, so each order goes through the usual photo/upload step.
+"""
+import csv
+import io
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from picking.catalog import Catalog
+
+WaveLine = namedtuple("WaveLine", ["order_id", "barcode", "qty"])
+Stop = namedtuple("Stop", ["seq", "barcode", "name", "target", "qty", "allocations"])  # allocations: ((order_id, qty), ...)
+Wave = namedtuple("Wave", ["orders", "stops", "unknown"])
+
+
+def parse_lines(text):
+    """``Order ID, Barcode[, Qty]`` per line (comma/tab/space separated) -> [WaveLine]."""
+    lines = []
+    for row in csv.reader(io.StringIO(text.replace('\t', ','))):
+        cells = [c.strip() for c in (row if len(row) > 1 else (row[0].split() if row else [])) if c.strip()]
+        if len(cells) < 2 or cells[0].lower() in ('order', 'order id'): continue
+        try: qty = int(float(cells[2])) if len(cells) > 2 else 1
+        except ValueError: continue
+        if qty > 0: lines.append(WaveLine(cells[0].upper(), cells[1], qty))
+    return lines
+
+
+def plan_wave(catalog, lines):
+    """Group ``lines`` per barcode and sort the stops along the pick path.
+
+    Unknown barcodes are returned in ``unknown`` (not dropped silently).
+    """
+    orders = list(OrderedDict.fromkeys(l.order_id for l in lines))
+    totals = OrderedDict()  # barcode -> OrderedDict(order_id -> qty)
+    for l in lines:
+        per_order = totals.setdefault(str(l.barcode), OrderedDict())
+        per_order[l.order_id] = per_order.get(l.order_id, 0) + l.qty
+    barcodes = list(totals)
+    rows = catalog.rows(barcodes)
+    known = rows >= 0
+    unknown = [WaveLine(o, b, q) for b, ok in zip(barcodes, known) if not ok for o, q in totals[b].items()]
+    idx = np.flatnonzero(known)
+    # เรียงตามเส้นทางเดิน (ทั้ง Batch ในครั้งเดียว) ถ้าตำแหน่งเท่ากันเรียงตามลำดับที่ป้อน
+    order = idx[np.argsort(catalog.path_rank()[rows[idx]], kind='stable')]
+    stops = []
+    for seq, i in enumerate(order):
+        b = barcodes[i]; entry = catalog.lookup(b)
+        alloc = tuple(totals[b].items())
+        stops.append(Stop(seq, b, Catalog.display_name(entry), Catalog.target_location(entry), sum(q for _, q in alloc), alloc))
+    return Wave(orders, stops, unknown)
+
+
+def split_picks(wave, picked):
+    """Basket items per order from ``picked`` (barcode -> (qty picked, scanned location)).
+
+    A short pick is given to orders in wave order; orders with nothing
+    picked still appear (empty list) so the caller can see them.
+    """
+    baskets = OrderedDict((o, []) for o in wave.orders)
+    for stop in wave.stops:
+        got = picked.get(stop.barcode)
+        if not got: continue
+        left, location = got
+        for order_id, want in stop.allocations:
+            take = min(want, left); left -= take
+            if take: baskets[order_id].append({"Barcode": stop.barcode, "Product Name": stop.name, "Location": location, "Qty": take})
+    return baskets
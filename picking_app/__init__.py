@@ -0,0 +1,7 @@
+"""Pages of the Smart Picking app (Amaze_app_MFC_Gmail.py).
+
+The main script only sets up the session and sidebar and imports the page
+that is open (``login``, ``pack``, ``rider``, ``batch``, ``admin``); shared
+resources live in ``services``. Modules are imported once per process, not
+re-executed on every rerun.
+"""
@@ -0,0 +1,107 @@
+"""Admin pages: performance spans / API health, and shift analytics."""
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from picking import analytics, metrics
+from picking.barcode import DECODE_STATS
+from picking.log_partitions import Partition
+from picking_app.services import (LOG_PARTITION, LOG_PARTITION_TARGET, LOG_SHEET_NAME, RIDER_SHEET_NAME, USER_SHEET_NAME, get_folder_cache,
+                                  get_google_clients, get_log_partitions, get_log_snapshots, get_outbox, get_scan_log, get_sheet_sync,
+                                  get_thai_ts_filename)
+
+ADMIN_WINDOWS = {"15 นาที": 900, "1 ชั่วโมง": 3600, "1 กะ (8 ชม.)": 8 * 3600, "ทั้งหมด": None}
+
+def render_admin_page():
+    st.title("📊 Admin: Performance")
+    c1, c2 = st.columns([1, 1])
+    scope = c1.radio("ขอบเขต", ["ทั้ง Process", "Session นี้"], horizontal=True)
+    window = ADMIN_WINDOWS[c2.selectbox("ช่วงเวลา", list(ADMIN_WINDOWS), index=2)]
+    filters = {'since': time.time() - window if window else None,
+               'session': metrics.current_session() if scope == "Session นี้" else None}
+    df = metrics.RECORDER.summary(**filters)
+    flows = df.set_index('name') if not df.empty else None
+    m1, m2, m3 = st.columns(3)
+    for col, name, label in [(m1, "flow.scan_to_confirm", "p95 สแกน→ยืนยัน"), (m2, "flow.confirm_to_synced", "p95 ยืนยัน→ส่งเสร็จ"),
+                             (m3, "job.pack_order", "p95 งานแพ็ค (เบื้องหลัง)")]:
+        hit = flows is not None and name in flows.index
+        col.metric(label, f"{flows.at[name, 'p95']:.1f}s" if hit else "-", f"{int(flows.at[name, 'count'])} ครั้ง" if hit else None, delta_color="off")
+    if df.empty: st.info("ยังไม่มีข้อมูล")
+    else:
+        view = df.copy()
+        for c in ['p50', 'p95', 'p99', 'max']: view[c] = (view[c] * 1000).round(1)
+        view['total'] = view['total'].round(2)
+        st.caption("p50/p95/p99/max = ms, total = วินาทีรวม, errors = ครั้งที่ Exception")
+        st.dataframe(view.rename(columns={c: f"{c} (ms)" for c in ['p50', 'p95', 'p99', 'max']}).rename(columns={'total': 'total (s)'}),
+                     use_container_width=True, hide_index=True)
+    st.download_button("⬇️ Export JSON Lines", metrics.RECORDER.to_jsonl(**filters), file_name=f"spans_{get_thai_ts_filename()}.jsonl",
+                       mime="application/x-ndjson")
+    with st.expander("Google API (Rate limit / Retry)"): st.json(get_google_clients().api_metrics())
+    with st.expander("Google Clients"): st.json(get_google_clients().stats())
+    with st.expander("Barcode decode"): st.json(DECODE_STATS.snapshot())
+    if LOG_PARTITION:
+        with st.expander(f"Log partitions ({LOG_PARTITION} / {LOG_PARTITION_TARGET})"):
+            parts = get_log_partitions()
+            st.dataframe(pd.DataFrame(parts.partitions(), columns=Partition._fields), use_container_width=True, hide_index=True)
+            st.json(parts.stats)
+    with st.expander("Outbox / Folder cache / Sheet sync"):
+        st.json({'outbox': get_outbox().counts(), 'folder_cache': get_folder_cache().stats(),
+                 'sheet_sync': {str(n): get_sheet_sync(n).stats for n in (0, USER_SHEET_NAME)}})
+
+@st.cache_resource(max_entries=8)
+def _build_shift_report(generations, start, end):
+    snaps = get_log_snapshots()
+    return analytics.shift_report(analytics.between(snaps[LOG_SHEET_NAME].frame(), start, end),
+                                  analytics.between(snaps[RIDER_SHEET_NAME].frame(), start, end),
+                                  analytics.between(get_scan_log().frame(), start, end, col='ts'))
+
+def load_shift_report(start, end):
+    # คำนวณครั้งเดียวต่อรุ่นข้อมูล + ช่วงวันที่ แชร์ทุก Session (เปิด Dashboard ซ้ำ = อ่านจาก Cache)
+    snaps = get_log_snapshots()
+    return _build_shift_report((snaps[LOG_SHEET_NAME].generation, snaps[RIDER_SHEET_NAME].generation, get_scan_log().generation), start, end)
+
+def render_analytics_page():
+    st.title("📈 Shift Analytics")
+    snaps = get_log_snapshots()
+    for snap in snaps.values(): snap.refresh_async()  # ครบรอบแล้วดึงแถวใหม่เบื้องหลัง หน้านี้ไม่รอ
+    get_scan_log().refresh_async()
+    today = (datetime.utcnow() + timedelta(hours=7)).date()
+    c1, c2 = st.columns([3, 1])
+    picked = c1.date_input("ช่วงวันที่", (today, today), max_value=today)
+    start, end = (tuple(picked) * 2)[:2] if isinstance(picked, (tuple, list)) else (picked, picked)
+    if c2.button("🔄 ดึงข้อมูลใหม่", use_container_width=True):
+        for snap in snaps.values(): snap.refresh_async(force=True)
+        get_scan_log().refresh_async(force=True)
+        st.toast("กำลังดึงแถวใหม่เบื้องหลัง", icon="🔄")
+    report = load_shift_report(start, end)
+    last = snaps[LOG_SHEET_NAME].stats['last_pull']
+    st.caption(f"ข้อมูลถึง {datetime.fromtimestamp(last).strftime('%H:%M:%S') if last else '-'} | "
+               f"{len(snaps[LOG_SHEET_NAME].raw())} แถวในเครื่อง | ดึงจากชีท {sum(s.stats['sheet_reads'] for s in snaps.values())} ครั้ง")
+    if not report['lines']: st.info("ยังไม่มีข้อมูลในช่วงนี้"); return
+
+    cycle = report['cycles']['seconds']; cycle = cycle[cycle > 0]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("รายการที่หยิบ", f"{report['lines']:,}"); m2.metric("Orders", f"{report['orders']:,}")
+    m3.metric("ชิ้น", f"{report['units']:,}")
+    m4.metric("p50 แพ็ค→ส่ง Rider", f"{cycle.median() / 60:.1f} นาที" if len(cycle) else "-")
+
+    st.markdown("#### ⏱️ Picks / ชั่วโมง")
+    st.dataframe(report['per_picker'].round(1), use_container_width=True, hide_index=True)
+    st.bar_chart(report['hourly'])
+
+    st.markdown("#### 🔁 Cycle time (วินาที)")
+    st.caption("ระหว่าง Order (ต่อคน) = เวลาจากยืนยัน Order ก่อนหน้าถึง Order ถัดไป | แพ็ค→ส่ง Rider = แถวแรก→แถวสุดท้ายของ Order")
+    st.dataframe(report['gaps'].round(0), use_container_width=True)
+
+    st.markdown("#### 📍 สแกนผิดตำแหน่ง (ตาม Location)")
+    errors = report['location_errors']
+    if errors.empty: st.info("ยังไม่มีข้อมูลการสแกน Location")
+    else: st.dataframe(errors.head(20).round(3), use_container_width=True, hide_index=True)
+
+    with st.expander("Snapshot"):
+        st.json({name: snap.stats for name, snap in snaps.items()})
+        if st.button("🗑️ ล้างสำเนาในเครื่อง (ดึงใหม่ทั้งหมด)"):
+            for snap in snaps.values(): snap.reset()
+            st.rerun()
@@ -0,0 +1,87 @@
+"""Batch (wave) picking page: several orders in one walk, then packed one by one."""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from picking.waves import parse_lines, plan_wave, split_picks
+from picking_app.services import PACK_MODE, drop_captures, load_catalog, record_flow
+from picking_app.widgets import check_location, scan_input
+
+
+def start_wave(text, catalog):
+    plan = plan_wave(catalog, parse_lines(text))
+    st.session_state.wave = {'plan': plan, 'idx': 0, 'picked': {}, 'packed': [], 'started_at': time.time(), 'loc': '', 'prod': ''}
+    return plan
+
+def advance_wave(wave, picked=None):
+    stop = wave['plan'].stops[wave['idx']]
+    if picked: wave['picked'][stop.barcode] = picked
+    wave['idx'] += 1; wave['loc'] = ''; wave['prod'] = ''
+    st.session_state.cam_counter += 1
+    if wave['idx'] >= len(wave['plan'].stops): record_flow("flow.wave_pick", wave['started_at'])
+
+def hand_off_to_pack(wave, order_id, items):
+    # ส่งรายการของ Order นี้เข้าขั้นตอนถ่ายรูป/Upload ของหน้าแพ็คตามปกติ
+    drop_captures(*st.session_state.photo_gallery); st.session_state.photo_gallery = []
+    st.session_state.order_val = order_id; st.session_state.current_order_items = list(items)
+    st.session_state.picking_phase = 'pack'; st.session_state.order_started_at = time.time()
+    wave['packed'].append(order_id)
+    st.session_state.pending_mode = PACK_MODE
+
+def render_wave_page(catalog):
+    st.title("📋 Batch Picking (หลาย Order)")
+    wave = st.session_state.wave
+    if wave is None:
+        st.info("ใส่รายการของทุก Order ใน Wave: หนึ่งบรรทัดต่อรายการ `Order ID, Barcode, Qty`")
+        text = st.text_area("รายการสินค้า", key="wave_lines", height=200, placeholder="B01, 8850000000012, 2\nB02, 8850000000029, 1")
+        if st.button("🧭 สร้าง Wave (เรียงตามเส้นทาง)", type="primary", use_container_width=True, disabled=not text.strip()):
+            if catalog.empty: st.warning("⚠️ Loading Data..."); return
+            plan = start_wave(text, catalog)
+            if not plan.stops: st.session_state.wave = None; st.error("❌ ไม่พบรายการที่ใช้ได้"); return
+            st.rerun()
+        return
+
+    plan = wave['plan']; n = len(plan.stops)
+    st.caption(f"{len(plan.orders)} Orders | {n} จุดหยิบ | {sum(s.qty for s in plan.stops)} ชิ้น")
+    if plan.unknown:
+        with st.expander(f"⚠️ ไม่พบ Barcode {len(plan.unknown)} รายการ"): st.dataframe(pd.DataFrame(plan.unknown), hide_index=True)
+
+    if wave['idx'] < n:
+        stop = plan.stops[wave['idx']]
+        st.progress(wave['idx'] / n, text=f"จุดที่ {wave['idx'] + 1}/{n}")
+        st.warning(f"📍 ไปที่: **{stop.target}**")
+        st.success(f"**{stop.name}** ({stop.barcode}) × {stop.qty}")
+        st.dataframe(pd.DataFrame(stop.allocations, columns=["Order ID", "Qty"]), hide_index=True, use_container_width=True)
+        cc = st.session_state.cam_counter
+        if not wave['loc']:
+            loc = scan_input("Location", f"wave_loc_man_{cc}", f"wave_loc_cam_{cc}", 'location')
+            if loc:
+                if check_location(catalog, loc, stop.barcode): wave['loc'] = loc; st.rerun()
+                else: st.error(f"❌ ผิดตำแหน่ง ({loc})")
+        elif not wave['prod']:
+            st.success(f"✅ Location: {wave['loc']}")
+            prod = scan_input("Barcode", f"wave_prod_man_{cc}", f"wave_prod_cam_{cc}", 'product', upper=False)
+            if prod:
+                if prod == stop.barcode: wave['prod'] = prod; st.rerun()
+                else: st.error(f"❌ สินค้าไม่ตรง ({prod})")
+        else:
+            st.success(f"✅ Location: {wave['loc']} | สินค้า: {wave['prod']}")
+            qty = st.number_input("จำนวนที่หยิบได้", min_value=0, max_value=stop.qty, value=stop.qty, key=f"wave_qty_{cc}")
+            if st.button("✅ หยิบแล้ว → จุดถัดไป", type="primary", use_container_width=True):
+                advance_wave(wave, (qty, wave['loc'])); st.rerun()
+        if st.button("⏭️ ข้ามจุดนี้"): advance_wave(wave); st.rerun()
+        return
+
+    st.success("✅ หยิบครบทุกจุดแล้ว แยกของตาม Order แล้วแพ็คทีละ Order")
+    for order_id, items in split_picks(plan, wave['picked']).items():
+        done = order_id in wave['packed']
+        st.markdown(f"**{order_id}** ({len(items)} รายการ){' ✅' if done else ''}")
+        if items: st.dataframe(pd.DataFrame(items), hide_index=True, use_container_width=True)
+        if st.button(f"📦 แพ็ค {order_id}", key=f"wave_pack_{order_id}", disabled=done or not items):
+            hand_off_to_pack(wave, order_id, items); st.rerun()
+    if st.button("🗑️ จบ Wave"): st.session_state.wave = None; st.rerun()
+
+
+def render():
+    render_wave_page(load_catalog())
@@ -0,0 +1,52 @@
+"""Login page: employee ID (typed or scanned) then password."""
+import time
+
+import streamlit as st
+
+from picking_app.services import load_user_index
+from picking_app.widgets import back_camera_input, decode_text
+
+
+def render():
+    st.title("🔐 Login พนักงาน")
+
+    if st.session_state.temp_login_user is None:
+        st.info("กรุณาสแกนรหัสพนักงาน")
+        col1, col2 = st.columns([3, 1])
+        manual_user = col1.text_input("พิมพ์รหัสพนักงาน", key="input_user_manual").strip()
+        cam_key_user = f"cam_user_{st.session_state.cam_counter}"
+        scan_user = back_camera_input("แตะเพื่อสแกนบัตรพนักงาน", key=cam_key_user)
+        
+        user_input_val = None
+        if manual_user: user_input_val = manual_user
+        elif scan_user:
+            user_input_val = decode_text(scan_user, 'user')
+        
+        if user_input_val:
+            with st.spinner("กำลังโหลดรายชื่อพนักงาน..."):  # รอเฉพาะครั้งแรกของ Process ถ้า warm_up ยังโหลดไม่เสร็จ
+                users = load_user_index()
+            if len(users):
+                entry = users.lookup(user_input_val)
+                if entry:
+                    # เก็บแค่รหัส/ชื่อใน Session (ไม่เก็บรหัสผ่าน)
+                    st.session_state.temp_login_user = {'id': entry.id, 'name': entry.name}
+                    st.rerun()
+                else: st.error(f"❌ ไม่พบรหัสพนักงาน: {user_input_val}")
+            else: st.warning("⚠️ โหลดข้อมูลพนักงานไม่ได้")
+    else:
+        user_info = st.session_state.temp_login_user
+        st.info(f"👤 พนักงาน: **{user_info['name']}** ({user_info['id']})")
+        password_input = st.text_input("🔑 กรุณากรอกรหัสผ่าน", type="password", key="login_pass_input").strip()
+        c1, c2 = st.columns([1, 1])
+        with c1:
+            if st.button("✅ ยืนยัน Login", type="primary", use_container_width=True):
+                if load_user_index().check(user_info['id'], password_input):
+                    st.session_state.current_user_id = user_info['id']
+                    st.session_state.current_user_name = user_info['name']
+                    st.session_state.temp_login_user = None
+                    st.toast(f"ยินดีต้อนรับคุณ {user_info['name']} 👋", icon="✅")
+                    time.sleep(1); st.rerun()
+                else: st.error("❌ รหัสผ่านไม่ถูกต้อง")
+        with c2:
+            if st.button("⬅️ เปลี่ยน User", use_container_width=True):
+                st.session_state.temp_login_user = None; st.rerun()
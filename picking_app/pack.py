@@ -0,0 +1,153 @@
+"""Pack page: order -> scan products at their bins -> photos -> outbox."""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from picking import metrics
+from picking.catalog import Catalog
+from picking.images import size_label
+from picking_app.services import (drop_captures, get_blob_store, get_outbox, get_thai_time, get_thai_ts_filename, load_catalog,
+                                  record_flow, store_capture)
+from picking_app.state import trigger_reset
+from picking_app.widgets import back_camera_input, check_location, decode_text, scan_input
+
+
+def render_bin_first(catalog):
+    # สแกนช่องวางก่อน -> เลือกสินค้าที่ควรอยู่ในช่องนั้น (กรอก Barcode + Location ให้)
+    with st.expander("📍 สแกน Location ก่อน (เลือกสินค้าจากช่อง)"):
+        cc = st.session_state.cam_counter
+        bin_code = scan_input("Location", f"bin_first_man_{cc}", f"bin_first_cam_{cc}", 'location')
+        if not bin_code: return
+        barcodes = catalog.location_index().products_at(bin_code)
+        if not barcodes: st.error(f"❌ ไม่มีสินค้าที่ {bin_code}"); return
+        for b in barcodes[:20]:
+            entry = catalog.lookup(b)
+            if st.button(f"{Catalog.display_name(entry)} ({b})", key=f"bin_pick_{cc}_{b}", use_container_width=True):
+                st.session_state.prod_val = b; st.session_state.loc_val = bin_code; st.rerun()
+        if len(barcodes) > 20: st.caption(f"... และอีก {len(barcodes) - 20} รายการ (สแกน Barcode แทน)")
+
+
+def render():
+    st.title("📦 ระบบเบิก-แพ็คสินค้า")
+    catalog = load_catalog()
+
+    if st.session_state.picking_phase == 'scan':
+        st.markdown("#### 1. Order ID")
+        if not st.session_state.order_val:
+            col1, col2 = st.columns([3, 1])
+            manual_order = col1.text_input("พิมพ์ Order ID", key="pack_order_man").strip().upper()
+            if manual_order: st.session_state.order_val = manual_order; st.session_state.order_started_at = time.time(); st.rerun()
+            scan_order = back_camera_input("แตะเพื่อสแกน Order", key=f"pack_cam_{st.session_state.cam_counter}")
+            if scan_order:
+                res = decode_text(scan_order, 'order')
+                if res: st.session_state.order_val = res.upper(); st.session_state.order_started_at = time.time(); st.rerun()
+        else:
+            c1, c2 = st.columns([3, 1])
+            with c1: st.success(f"📦 Order: **{st.session_state.order_val}**")
+            with c2: 
+                if st.button("เปลี่ยน Order"): trigger_reset(); st.rerun()
+
+        if st.session_state.order_val:
+            st.markdown("---"); st.markdown("#### 2. เพิ่มรายการสินค้า (Scan & Add)")
+            if not st.session_state.prod_val:
+                col1, col2 = st.columns([3, 1])
+                manual_prod = col1.text_input("พิมพ์ Barcode", key="pack_prod_man").strip()
+                if manual_prod: st.session_state.prod_val = manual_prod; st.rerun()
+                scan_prod = back_camera_input("แตะเพื่อสแกนสินค้า", key=f"prod_cam_{st.session_state.cam_counter}")
+                if scan_prod:
+                    res_p = decode_text(scan_prod, 'product')
+                    if res_p: st.session_state.prod_val = res_p; st.rerun()
+                if not catalog.empty: render_bin_first(catalog)
+            else:
+                target_loc_str = None; prod_found = False
+                if not catalog.empty:
+                    entry = catalog.lookup(st.session_state.prod_val)
+                    if entry:
+                        prod_found = True
+                        full_name = Catalog.display_name(entry)
+                        st.session_state.prod_display_name = full_name
+                        target_loc_str = Catalog.target_location(entry)
+                        st.success(f"✅ **{full_name}**"); st.warning(f"📍 เป้าหมาย: **{target_loc_str}**")
+                    else: st.error("❌ ไม่พบ Barcode")
+                else: st.warning("⚠️ Loading Data...")
+                
+                if st.button("❌ สแกนใหม่"): 
+                    st.session_state.prod_val = ""; st.session_state.cam_counter += 1; st.rerun()
+
+                if prod_found and target_loc_str:
+                    st.markdown("---"); st.markdown("##### ยืนยัน Location")
+                    if not st.session_state.loc_val:
+                        man_loc = st.text_input("Scan/พิมพ์ Location", key="loc_man").strip().upper()
+                        if man_loc: st.session_state.loc_val = man_loc; st.rerun()
+                        scan_loc = back_camera_input("แตะเพื่อสแกน Location", key=f"loc_cam_{st.session_state.cam_counter}")
+                        if scan_loc:
+                            res_l = decode_text(scan_loc, 'location')
+                            if res_l: st.session_state.loc_val = res_l.upper(); st.rerun()
+                    else:
+                        if check_location(catalog, st.session_state.loc_val, st.session_state.prod_val):
+                            st.success(f"✅ ถูกต้อง: {st.session_state.loc_val}")
+                            st.markdown("##### ระบุจำนวน")
+                            st.session_state.pick_qty = st.number_input("จำนวน (Qty)", min_value=1, value=1)
+                            st.markdown("---")
+                            if st.button("➕ เพิ่มลงตะกร้า", type="primary", use_container_width=True):
+                                new_item = {"Barcode": st.session_state.prod_val, "Product Name": st.session_state.prod_display_name, "Location": st.session_state.loc_val, "Qty": st.session_state.pick_qty}
+                                st.session_state.current_order_items.append(new_item)
+                                st.toast(f"เพิ่ม {st.session_state.prod_display_name} แล้ว!", icon="🛒")
+                                st.session_state.prod_val = ""; st.session_state.loc_val = ""; st.session_state.pick_qty = 1; st.session_state.cam_counter += 1
+                                st.rerun()
+                        else:
+                            st.error(f"❌ ผิดตำแหน่ง ({st.session_state.loc_val})")
+                            if st.button("แก้ Location"): st.session_state.loc_val = ""; st.rerun()
+
+            if st.session_state.current_order_items:
+                st.markdown("---")
+                st.markdown(f"### 🛒 ตะกร้าสินค้า ({len(st.session_state.current_order_items)} รายการ)")
+                st.dataframe(pd.DataFrame(st.session_state.current_order_items), use_container_width=True)
+                if st.button("✅ ยืนยันรายการครบแล้ว (ไปถ่ายรูป)", type="primary", use_container_width=True):
+                    st.session_state.picking_phase = 'pack'; st.rerun()
+
+    elif st.session_state.picking_phase == 'pack':
+        st.success(f"📦 Order: **{st.session_state.order_val}** (ยืนยันแล้ว)")
+        st.info("รายการสินค้าที่จะแพ็ค:")
+        st.dataframe(pd.DataFrame(st.session_state.current_order_items), use_container_width=True)
+        st.markdown("#### 3. ถ่ายรูปปิดกล่อง (รวมทุกชิ้น)")
+        
+        if st.session_state.photo_gallery:
+            cols = st.columns(5)
+            for idx, img in enumerate(st.session_state.photo_gallery):
+                with cols[idx]:
+                    # โชว์แค่ Thumbnail (ไฟล์เต็มเก็บไว้ Upload อย่างเดียว)
+                    st.image(get_blob_store().path(img['thumb']), use_column_width=True)
+                    st.caption(f"{size_label(img['original_bytes'])}→{size_label(img['bytes'])} ({img['encode_s'] * 1000:.0f}ms)")
+                    if st.button("🗑️", key=f"del_{idx}"): drop_captures(st.session_state.photo_gallery.pop(idx)); st.rerun()
+        
+        if len(st.session_state.photo_gallery) < 5:
+            pack_img = back_camera_input("ถ่ายรูปสินค้ากองรวม (กล้องหลัง)", key=f"pack_cam_fin_{st.session_state.cam_counter}")
+            if pack_img:
+                st.session_state.photo_gallery.append(store_capture(pack_img))
+                st.session_state.cam_counter += 1; st.rerun()
+        
+        col_b1, col_b2 = st.columns([1, 1])
+        with col_b1:
+            if st.button("⬅️ กลับไปแก้ไขรายการ"):
+                drop_captures(*st.session_state.photo_gallery)
+                st.session_state.picking_phase = 'scan'; st.session_state.photo_gallery = []; st.rerun()
+        with col_b2:
+            if len(st.session_state.photo_gallery) > 0:
+                if st.button("☁️ ยืนยัน Upload ทั้งหมด", type="primary", use_container_width=True):
+                    record_flow("flow.scan_to_confirm", st.session_state.order_started_at)
+                    # เข้าคิว Outbox แล้วไปออเดอร์ถัดไปได้เลย (Upload/บันทึก Sheet ทำเบื้องหลัง)
+                    get_outbox().enqueue('pack_order', {
+                        'order_id': st.session_state.order_val,
+                        'picker_name': st.session_state.current_user_name,
+                        'user_id': st.session_state.current_user_id,
+                        'items': st.session_state.current_order_items,
+                        'timestamp': get_thai_time(),
+                        'ts': get_thai_ts_filename(),
+                        'confirmed_at': time.time(), 'session': metrics.current_session(),
+                    }, files=[get_blob_store().path(img['blob']) for img in st.session_state.photo_gallery],  # ย้ายไฟล์เข้า Outbox (ไม่โหลดเข้า Memory)
+                       key=f"pack:{st.session_state.order_val}:{st.session_state.photo_gallery[0]['blob']}")  # กดซ้ำ/Rerun ซ้ำ = งานเดิม ไม่เข้าคิวสองรอบ
+                    st.toast(f"✅ บันทึก Order {st.session_state.order_val} แล้ว (กำลังส่งเบื้องหลัง)", icon="📤")
+                    trigger_reset()
+                    st.rerun()
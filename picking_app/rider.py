@@ -0,0 +1,80 @@
+"""Rider hand-off page: find the order's folder, take the hand-off photo, queue the upload."""
+import hashlib
+import time
+
+import streamlit as st
+
+from picking import metrics
+from picking_app.services import (drop_captures, find_rider_folder, get_blob_store, get_outbox, get_thai_time, get_thai_ts_filename,
+                                  record_flow, store_capture, PENDING_FOLDER_ID)
+from picking_app.state import trigger_reset
+from picking_app.widgets import back_camera_input, decode_text
+
+
+def render():
+    st.title("🏍️ ส่งงาน Rider")
+    st.info("ถ่ายรูปเพิ่มเติมเพื่อส่งให้ Rider (จะบันทึกลง Folder เดิม)")
+
+    st.markdown("#### 1. สแกน Order ที่จะส่ง")
+    col_r1, col_r2 = st.columns([3, 1])
+    man_rider_ord = col_r1.text_input("พิมพ์ Order ID", key="rider_ord_man").strip().upper()
+    
+    # Camera Input
+    scan_rider_ord = back_camera_input("แตะเพื่อสแกน Order", key=f"rider_cam_ord_{st.session_state.cam_counter}")
+    
+    current_rider_order = ""
+    if man_rider_ord: current_rider_order = man_rider_ord
+    elif scan_rider_ord:
+        res = decode_text(scan_rider_ord, 'rider_order')
+        if res: current_rider_order = res.upper()
+
+    # หา Folder เฉพาะตอน Order เปลี่ยน (Rerun จากปุ่ม/กล้องใช้ผลเดิมใน Session)
+    looked_up = (current_rider_order == st.session_state.order_val
+                 and (st.session_state.target_rider_folder_id or st.session_state.target_rider_folder_name))
+    if current_rider_order and not looked_up:
+        st.session_state.order_val = current_rider_order; st.session_state.order_started_at = time.time()
+        with st.spinner(f"🔍 กำลังหา Folder ของ {current_rider_order}..."):
+            folder_id, folder_name = find_rider_folder(current_rider_order)
+            st.session_state.target_rider_folder_id = folder_id
+            st.session_state.target_rider_folder_name = folder_name  # ถ้าไม่เจอ = ข้อความ Error
+
+    if current_rider_order:
+        if st.session_state.target_rider_folder_id == PENDING_FOLDER_ID:
+            st.info(f"⏳ {st.session_state.target_rider_folder_name}")
+        elif st.session_state.target_rider_folder_id:
+            st.success(f"✅ เจอ Folder: **{st.session_state.target_rider_folder_name}**")
+        elif st.session_state.target_rider_folder_name:
+            st.error(f"❌ {st.session_state.target_rider_folder_name}")
+            if st.button("🔄 ค้นหาใหม่"):
+                st.session_state.target_rider_folder_name = ""; st.rerun()
+
+    if st.session_state.get('target_rider_folder_id') and st.session_state.order_val:
+        st.markdown("---"); st.markdown(f"#### 2. ถ่ายรูปส่งมอบ ({st.session_state.target_rider_folder_name})")
+        rider_img_input = back_camera_input("ถ่ายรูปส่งมอบ", key=f"rider_cam_act_{st.session_state.cam_counter}")
+        
+        if rider_img_input:
+            # ย่อ/บีบอัดครั้งเดียวต่อรูป (Rerun ใช้ไฟล์เดิม)
+            capture_id = hashlib.sha1(rider_img_input.getvalue()).hexdigest()  # กล้องคืน BytesIO ใหม่ทุก Rerun -> ใช้เนื้อไฟล์เป็น ID
+            if not st.session_state.rider_photo or st.session_state.rider_photo.get('capture_id') != capture_id:
+                drop_captures(st.session_state.rider_photo)
+                st.session_state.rider_photo = dict(store_capture(rider_img_input), capture_id=capture_id)
+            st.image(get_blob_store().path(st.session_state.rider_photo['thumb']), caption="รูปที่จะส่ง", width=240)
+            col_upload, col_clear = st.columns([2, 1])
+            with col_clear:
+                if st.button("🗑️ ซ่อน/ถ่ายใหม่", type="secondary", use_container_width=True):
+                     st.session_state.cam_counter += 1; st.rerun()
+            with col_upload:
+                if st.button("🚀 ยืนยันส่งรูปนี้", type="primary", use_container_width=True):
+                    record_flow("flow.rider_scan_to_confirm", st.session_state.order_started_at)
+                    get_outbox().enqueue('rider_photo', {
+                        'order_id': st.session_state.order_val,
+                        'picker_name': st.session_state.current_user_name,
+                        'folder_id': st.session_state.target_rider_folder_id,
+                        'folder_name': st.session_state.target_rider_folder_name,
+                        'filename': f"RIDER_{st.session_state.order_val}_{get_thai_ts_filename()}.jpg",
+                        'timestamp': get_thai_time(),
+                        'confirmed_at': time.time(), 'session': metrics.current_session(),
+                    }, files=[get_blob_store().path(st.session_state.rider_photo['blob'])],
+                       key=f"rider:{st.session_state.order_val}:{st.session_state.rider_photo['blob']}")
+                    st.toast("บันทึกรูป Rider สำเร็จ! (กำลังส่งเบื้องหลัง)", icon="📤")
+                    trigger_reset(); st.rerun()
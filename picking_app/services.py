@@ -0,0 +1,447 @@
+"""Shared resources of the Streamlit app: configuration, Google clients,
+sheet/catalog caches, log writers, Drive folders, photo blobs and the
+background outbox.
+
+The main script is re-executed on every rerun; this module is imported once
+per process, so each ``st.cache_resource`` here is declared once. Google,
+pandas and image libraries are imported inside the functions that need
+them, and ``warm_up`` loads them in the background after the first paint.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from picking import metrics
+from picking.blobstore import BlobStore
+from picking.drive_folders import FolderCache, create_folder, find_folder
+from picking.outbox import Outbox, OutboxWorker
+from picking.sheet_logs import LogBatch, LOG_HEADERS, RIDER_HEADERS, pick_log_row, rider_log_row
+
+# --- CONFIGURATION ---
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_FOLDER_ID = '1VjyciJOBhBNCwo9z2iF1WVWXQjTyRkJ2'
+PENDING_FOLDER_ID = 'pending'  # หน้า Rider: Folder ยังรองานแพ็คใน Outbox สร้าง
+SHEET_ID = '1rWgqfrut0H0wRSTocEq04mGGgnZs0T45uaMYZmXVdj8'
+LOG_SHEET_NAME = 'Logs'
+RIDER_SHEET_NAME = 'Rider_Logs'
+USER_SHEET_NAME = 'User'
+# รูปหลักฐาน: ด้านยาวสุด (px), คุณภาพ JPEG, progressive, ขนาด/คุณภาพ Thumbnail ที่โชว์ในหน้าจอ
+IMAGE_SETTINGS = dict(max_edge=1600, quality=80, progressive=True, thumb_edge=240, thumb_quality=70)
+BLOB_DIR = os.environ.get('PICKING_BLOB_DIR', os.path.join(tempfile.gettempdir(), 'picking_blobs'))
+# แบ่ง Log ตามช่วงเวลา: '' = ชีทเดียวแบบเดิม, 'day' / 'month' = ชีทใหม่ต่อวัน/เดือน
+# PICKING_LOG_PARTITION_TARGET: 'worksheet' (ในไฟล์เดิม) หรือ 'spreadsheet' (ไฟล์ใหม่ต่อช่วง ไม่ชน Cell limit)
+LOG_PARTITION = os.environ.get('PICKING_LOG_PARTITION', '')
+LOG_PARTITION_TARGET = os.environ.get('PICKING_LOG_PARTITION_TARGET', 'worksheet')
+WARM_UP = os.environ.get('PICKING_WARM_UP', '1') != '0'
+# Cell ในชีทสินค้าที่เปลี่ยนค่าทุกครั้งที่แก้ชีท (เช่น onEdit ของ Apps Script เขียนเวลาลง Z1)
+# มีแล้ว: Refresh ดึงเฉพาะแถวใหม่ + โหลดทั้งชีทเมื่อค่าเปลี่ยน | ไม่มี: โหลดทั้งชีททุก TTL (แก้ Zone/Location เห็นภายใน 10 นาที)
+CATALOG_VERSION_CELL = os.environ.get('PICKING_CATALOG_VERSION_CELL', '')
+ADMIN_IDS_ENV = os.environ.get('PICKING_ADMIN_IDS', '')  # รหัสพนักงานที่เห็นหน้า Admin (คั่นด้วย ,) เพิ่มจาก Secrets admin_ids ได้
+OUTBOX_PATH = os.environ.get('PICKING_OUTBOX_PATH', os.path.join(APP_DIR, '.outbox', 'outbox.sqlite3'))
+# สำเนา Log แบบ Parquet ในเครื่อง (หน้า Analytics อ่านจากตรงนี้ ไม่อ่านชีทสด)
+ANALYTICS_DIR = os.environ.get('PICKING_ANALYTICS_DIR', os.path.join(APP_DIR, '.analytics'))
+# ชื่อโหมดใน Sidebar
+PACK_MODE = "📦 แผนกแพ็คสินค้า"
+BATCH_MODE = "📋 Batch Picking"
+RIDER_MODE = "🏍️ ส่งงาน Rider"
+ADMIN_MODE = "📊 Admin"
+ANALYTICS_MODE = "📈 Analytics"
+
+# --- AUTHENTICATION ---
+def get_credentials():
+    from google.oauth2.credentials import Credentials
+    try:
+        if "oauth" in st.secrets:
+            info = st.secrets["oauth"]
+            creds = Credentials(
+                None,
+                refresh_token=info["refresh_token"],
+                token_uri="https://oauth2.googleapis.com/token",
+                client_id=info["client_id"],
+                client_secret=info["client_secret"],
+                scopes=[
+                    "https://www.googleapis.com/auth/spreadsheets",
+                    "https://www.googleapis.com/auth/drive"
+                ]
+            )
+            return creds
+        else:
+            st.error("❌ ไม่พบข้อมูล [oauth] ใน Secrets")
+            return None
+    except Exception as e:
+        st.error(f"❌ Error Credentials: {e}")
+        return None
+
+@st.cache_resource
+def get_google_clients():
+    from picking.google_clients import GoogleClients  # gspread / googleapiclient โหลดเมื่อใช้ครั้งแรก
+    # Credentials / gspread / Spreadsheet / Drive service ชุดเดียวทั้ง Process (Refresh Token เมื่อหมดอายุเท่านั้น)
+    return GoogleClients(get_credentials, SHEET_ID)
+
+def authenticate_drive():
+    try:
+        return get_google_clients().drive()
+    except Exception as e:
+        st.error(f"Error Drive: {e}")
+        return None
+
+# --- GOOGLE SERVICES ---
+def open_spreadsheet():
+    sh = get_google_clients().spreadsheet()
+    if sh is None: raise RuntimeError("No credentials")
+    return sh
+
+def open_worksheet(sheet_name=0):
+    sh = open_spreadsheet()
+    if isinstance(sheet_name, int): return sh.get_worksheet(sheet_name)
+    return sh.worksheet(sheet_name)
+
+@st.cache_resource
+def get_sheet_sync(sheet_name=0):
+    import pandas as pd
+    from picking.sheet_sync import SheetSync
+    if int(pd.__version__.split('.')[0]) < 3: pd.set_option('mode.copy_on_write', True)  # pandas 3 เปิด Copy-on-Write ไว้เสมอ
+    # แชร์ทุก Session: หมด TTL แล้ว Refresh เบื้องหลัง (ดึงเฉพาะแถวใหม่) ไม่มีใครต้องรอโหลดใหม่ทั้งชีท
+    # ชีท User โหลดใหม่ทั้งชีททุก TTL (ลบพนักงาน/เปลี่ยนรหัสผ่าน มีผลภายใน 10 นาทีเสมอ)
+    if sheet_name == USER_SHEET_NAME: extra = {'full_every': 0}
+    elif sheet_name == 0: extra = {'version_cell': CATALOG_VERSION_CELL} if CATALOG_VERSION_CELL else {'full_every': 0}
+    else: extra = {}
+    return SheetSync(lambda: open_worksheet(sheet_name), ttl=600, name=str(sheet_name), **extra)
+
+def load_sheet_data(sheet_name=0):
+    # View แบบไม่ Copy ของตารางที่แชร์ทุก Session (Copy-on-Write)
+    return get_sheet_sync(sheet_name).view()
+
+@st.cache_resource(max_entries=2)
+def _build_catalog(generation):
+    from picking.catalog import Catalog
+    return Catalog.from_frame(load_sheet_data(0))
+
+def load_catalog():
+    # สร้าง Index Barcode ครั้งเดียวต่อการ Refresh แล้วแชร์ทุก Session (ไม่ Copy ทุก Rerun)
+    sync = get_sheet_sync(0); sync.get()
+    return _build_catalog(sync.generation)
+
+@st.cache_resource(max_entries=2)
+def _build_user_index(generation):
+    from picking.users import UserIndex
+    return UserIndex.from_frame(get_sheet_sync(USER_SHEET_NAME).get())
+
+def load_user_index():
+    # รหัสพนักงาน -> (Hash รหัสผ่าน, ชื่อ) สร้างครั้งเดียวต่อการ Refresh แชร์ทุก Session
+    # Refresh ทำเบื้องหลัง (SheetSync) -> Login เป็นแค่ Dict lookup
+    # ยกเว้นโหลดครั้งแรกของ Process ที่ต้องรอชีท (ปกติ warm_up โหลดไว้ตั้งแต่หน้าแรกแสดง)
+    sync = get_sheet_sync(USER_SHEET_NAME); sync.get()
+    return _build_user_index(sync.generation)
+
+# --- TIME HELPER ---
+def get_thai_time(): return (datetime.utcnow() + timedelta(hours=7)).strftime("%Y-%m-%d %H:%M:%S")
+def get_thai_date_str(): return (datetime.utcnow() + timedelta(hours=7)).strftime("%d-%m-%Y")
+def get_thai_time_suffix(): return (datetime.utcnow() + timedelta(hours=7)).strftime("%H-%M")
+def get_thai_ts_filename(): return (datetime.utcnow() + timedelta(hours=7)).strftime("%Y%m%d_%H%M%S")
+
+@st.cache_resource
+def get_log_partitions():
+    from picking.log_partitions import LogPartitions
+    # Manifest ของ Partition แชร์ทุก Session (โหลดครั้งเดียว)
+    gc = lambda: get_google_clients().gspread_client()
+    return LogPartitions(open_spreadsheet, LOG_PARTITION, LOG_PARTITION_TARGET,
+                         create_spreadsheet=lambda title: gc().create(title), open_spreadsheet=lambda key: gc().open_by_key(key))
+
+def log_partition(base, timestamp):
+    # ชื่อชีทปลายทางของ Log (ไม่เปิด Partition = ชีทเดิม)
+    return get_log_partitions().route(base, timestamp) if LOG_PARTITION else None
+
+def log_sources(base):
+    # ชีทที่มีแถวของ Log นี้: ชีทเดิม + ทุก Partition (Partition ที่จบแล้วมี End ให้ข้ามได้)
+    sources = [(base, lambda: open_worksheet(base), None)]
+    if LOG_PARTITION:
+        parts = get_log_partitions()
+        sources += [(f"{p.spreadsheet_id}/{p.worksheet}", lambda p=p: parts.open(p).worksheet(p.worksheet), p.end)
+                    for p in parts.partitions(base, refresh=True)]
+    return sources
+
+@st.cache_resource
+def get_log_snapshots():
+    from picking import analytics
+    # สำเนา Log ในเครื่อง แชร์ทุก Session: ดึงเฉพาะแถวใหม่ ไม่เกินทุก 5 นาทีต่อ Process
+    return {base: analytics.LogSnapshot(os.path.join(ANALYTICS_DIR, base), lambda base=base: log_sources(base), headers, name=base)
+            for base, headers in ((LOG_SHEET_NAME, LOG_HEADERS), (RIDER_SHEET_NAME, RIDER_HEADERS))}
+
+@st.cache_resource
+def get_scan_log():
+    from picking import analytics
+    # สแกนต่อท้ายไฟล์เล็กๆ แล้วรวมเข้า Part file ไม่เกินทุก 5 นาที (Cache รายงานไม่ล้างทุกครั้งที่สแกน)
+    return analytics.ScanLog(os.path.join(ANALYTICS_DIR, 'scans'))
+
+def flush_log_batch(batch, label="Log", raise_errors=False, partition=None):
+    # เปิด Spreadsheet ครั้งเดียว แล้วเขียนทุกแถว (ทุก Order ใน batch) ด้วย append_rows ครั้งเดียวต่อชีท
+    try:
+        with metrics.span(f"stage.log_flush.{label}", orders=len(batch.orders)) as attrs:
+            sh = get_log_partitions().open(partition) if partition else open_spreadsheet()
+            res = batch.flush(sh)
+            attrs.update(rows=res.rows, api_calls=res.api_calls)
+        return res
+    except Exception as e:
+        if raise_errors: raise
+        st.warning(f"⚠️ บันทึก {label} ไม่สำเร็จ: {e}")
+        return None
+
+def save_log_to_sheet(picker_name, order_id, items, user_col, file_id, timestamp=None, raise_errors=False):
+    timestamp = timestamp or get_thai_time(); batch = LogBatch()
+    part = log_partition(LOG_SHEET_NAME, timestamp)
+    rows = [pick_log_row(timestamp, picker_name, order_id, it['Barcode'], it['Product Name'], it['Location'], it['Qty'], user_col, file_id) for it in items]
+    batch.add_order(part.worksheet if part else LOG_SHEET_NAME, order_id, rows, headers=LOG_HEADERS)
+    return flush_log_batch(batch, "Log", raise_errors, part)
+
+def save_rider_log(picker_name, order_id, file_id, folder_name, timestamp=None, raise_errors=False):
+    timestamp = timestamp or get_thai_time(); batch = LogBatch()
+    part = log_partition(RIDER_SHEET_NAME, timestamp)
+    batch.add(part.worksheet if part else RIDER_SHEET_NAME, rider_log_row(timestamp, picker_name, order_id, folder_name, file_id), headers=RIDER_HEADERS, order_id=order_id)
+    return flush_log_batch(batch, "Rider Log", raise_errors, part)
+
+def log_rows_written(base, order_id, timestamp):
+    # อ่านกลับเฉพาะตอน Retry ที่รอบก่อนเริ่ม append แล้วแต่ไม่ได้จดผล: มีแถวของ Order นี้ (เวลาเดียวกัน) ในชีทแล้วหรือยัง
+    from gspread.exceptions import WorksheetNotFound
+    part = log_partition(base, timestamp)
+    sh = get_log_partitions().open(part) if part else open_spreadsheet()
+    try: ws = sh.worksheet(part.worksheet if part else base)
+    except WorksheetNotFound: return False
+    # คอลัมน์ A = Timestamp, C = Order ID (ทั้ง Logs และ Rider_Logs)
+    return any(len(r) > 2 and r[0] == timestamp and r[2] == order_id for r in ws.get("A:C"))
+
+# --- [MODIFIED] FOLDER STRUCTURE LOGIC ---
+@st.cache_resource
+def get_folder_cache():
+    # Cache ID ของ Folder ปี/เดือน/วันที่ แชร์ทุก Session หมดอายุเมื่อขึ้นวันใหม่
+    return FolderCache()
+
+def get_target_folder_structure(service, order_id, main_parent_id, now=None, reuse=False):
+    # คำนวณวันเวลาปัจจุบัน (Job ใน Outbox ส่งเวลาที่กดยืนยันมา -> Retry ได้ Folder ชื่อเดิม)
+    now = now or datetime.utcnow() + timedelta(hours=7)
+    year_str = now.strftime("%Y")
+    month_str = now.strftime("%m")
+    date_str = now.strftime("%d-%m-%Y")
+    cache = get_folder_cache()
+
+    # Step 1: จัดการ Folder ปี (YYYY)
+    year_id = cache.resolve(service, main_parent_id, year_str, date_str)
+    
+    # Step 2: จัดการ Folder เดือน (MM)
+    month_id = cache.resolve(service, year_id, month_str, date_str)
+    
+    # Step 3: จัดการ Folder วันที่ (DD-MM-YYYY)
+    date_id = cache.resolve(service, month_id, date_str, date_str)
+
+    # Step 4: สร้าง Folder Order (OrderNumber_HH-MM)
+    time_suffix = now.strftime("%H-%M")
+    order_folder_name = f"{order_id}_{time_suffix}"
+    with metrics.span("stage.create_order_folder", order_id=order_id):
+        # reuse: รอบก่อนอาจสร้าง Folder แล้วแต่ยังไม่ได้จด -> หาก่อนสร้าง
+        order_folder_id = (reuse and find_folder(service, date_id, order_folder_name)) or create_folder(service, date_id, order_folder_name)
+    cache.put_order(order_id, order_folder_id, order_folder_name, date_str)  # ให้หน้า Rider หาเจอโดยไม่ต้องค้น Drive
+    return order_folder_id, order_folder_name
+
+def find_existing_order_folder(service, order_id, main_parent_id, now=None):
+    # คำนวณวันเวลาปัจจุบันเพื่อหา Path (Job Rider ใน Outbox ส่งเวลาที่กดยืนยันมา)
+    now = now or datetime.utcnow() + timedelta(hours=7)
+    year_str = now.strftime("%Y")
+    month_str = now.strftime("%m")
+    date_str = now.strftime("%d-%m-%Y")
+    cache = get_folder_cache()
+    hit = cache.get_order(order_id, date_str)
+    if hit: return hit
+
+    # Step 1: หา Folder ปี (YYYY)
+    year_id = cache.resolve(service, main_parent_id, year_str, date_str, create=False)
+    if not year_id: return None, "ไม่พบ Folder ปีปัจจุบัน"
+
+    # Step 2: หา Folder เดือน (MM)
+    month_id = cache.resolve(service, year_id, month_str, date_str, create=False)
+    if not month_id: return None, "ไม่พบ Folder เดือนปัจจุบัน"
+
+    # Step 3: หา Folder วันที่ (DD-MM-YYYY)
+    date_id = cache.resolve(service, month_id, date_str, date_str, create=False)
+    if not date_id: return None, "ไม่พบ Folder วันที่ของวันนี้ (ยังไม่มีการเปิดบิลวันนี้)"
+    
+    # Step 4: หา Folder Order ภายใต้ Folder วันที่
+    # 1. ค้นหาแบบกว้างๆ ก่อน
+    q_order = f"'{date_id}' in parents and name contains '{order_id}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
+    res_order = service.files().list(q=q_order, fields="files(id, name)", orderBy="createdTime desc").execute()
+    files_order = res_order.get('files', [])
+    
+    # 2. กรองให้ชัวร์ว่าขึ้นต้นด้วย OrderID_
+    target_prefix = f"{order_id}_" # เช่น "B01_"
+    
+    found_folder = None
+    for f in files_order:
+        if f['name'].startswith(target_prefix):
+            found_folder = f
+            break
+            
+    if found_folder:
+        cache.put_order(order_id, found_folder['id'], found_folder['name'], date_str)
+        return found_folder['id'], found_folder['name']
+    else:
+        return None, f"ไม่พบ Folder ของ Order: {order_id} ในวันนี้"
+
+def find_rider_folder(order_id):
+    # เช็ค Index ในเครื่องก่อน (ไม่ต้องต่อ Drive) ถ้าไม่เจอค่อยค้นใน Drive
+    hit = get_folder_cache().get_order(order_id, get_thai_date_str())
+    if hit:
+        metrics.record("stage.find_rider_folder", 0.0, cache='hit'); return hit
+    # งานแพ็คยังค้างใน Outbox (Folder ยังไม่ถูกสร้าง / Drive ล่ม) -> ให้ถ่ายได้เลย Job Rider จะหา Folder เองตอนส่ง
+    if get_outbox().open_jobs('pack_order', order_id):
+        metrics.record("stage.find_rider_folder", 0.0, cache='pending')
+        return PENDING_FOLDER_ID, f"{order_id} (รอสร้าง Folder จากงานแพ็คที่กำลังส่ง)"
+    srv = authenticate_drive()
+    if not srv: return None, "เชื่อมต่อ Google Drive ไม่ได้"
+    with metrics.span("stage.find_rider_folder", cache='miss'):
+        return find_existing_order_folder(srv, order_id, MAIN_FOLDER_ID)
+# ---------------------------------------------
+
+# --- PHOTO BLOBS ---
+@st.cache_resource
+def get_blob_store():
+    # รูปเก็บเป็นไฟล์ ใน Session เก็บแค่ชื่อ (handle)
+    return BlobStore(BLOB_DIR)
+
+def store_capture(file_obj):
+    from picking.images import ImageSettings, process_capture  # PIL โหลดเมื่อถ่ายรูปครั้งแรก
+    with metrics.span("stage.process_capture") as attrs:
+        p_img = process_capture(file_obj, ImageSettings(**IMAGE_SETTINGS))
+        attrs.update(bytes_in=p_img.original_bytes, bytes_out=len(p_img.data), size=list(p_img.size), encode_s=round(p_img.encode_seconds, 4))
+    store = get_blob_store()
+    return {'blob': store.put(p_img.data), 'thumb': store.put(p_img.thumb), 'bytes': len(p_img.data),
+            'original_bytes': p_img.original_bytes, 'encode_s': p_img.encode_seconds}
+
+def drop_captures(*items):
+    get_blob_store().delete(*[h for it in items if it for h in (it.get('blob'), it.get('thumb'))])
+
+# --- BACKGROUND OUTBOX ---
+# งานเหล่านี้รันใน Thread ของ OutboxWorker (ห้ามเรียก st.* ที่แสดงผล) ถ้า Error ให้ raise เพื่อ Retry
+# journal จดทุกขั้นที่สำเร็จแล้ว (Folder / รูป / แถว Log) -> Retry ทำต่อจากขั้นที่ค้าง ไม่สร้าง Folder / Upload / เขียนแถวซ้ำ
+def job_started(journal):
+    # เคยรันมาก่อนหรือยัง (จดไว้ใน journal: requeue จากหน้า Admin รีเซ็ต attempts แต่ไม่ลบ journal)
+    if 'started' in journal: return True
+    journal.put('started', True); return False
+
+def write_log_once(journal, base, order_id, timestamp, write):
+    # log_pending จดก่อน append: ถ้ารอบก่อนตายหลัง append -> อ่านกลับก่อน ไม่เขียนซ้ำ
+    if 'log' in journal: return
+    if 'log_pending' not in journal or not log_rows_written(base, order_id, timestamp):
+        journal.put('log_pending', True); write()
+    journal.put('log', True)
+
+def process_pack_job(job, photos, journal):
+    p = job.payload
+    with metrics.session_scope(p.get('session')), metrics.span("job.pack_order", order_id=p['order_id'], attempt=job.attempts):
+        _process_pack_job(p, photos, journal, retry=job_started(journal))
+    record_flow("flow.confirm_to_synced", p.get('confirmed_at'), session=p.get('session'))
+
+def _process_pack_job(p, photos, journal, retry=False):
+    from picking.drive_upload import list_files, upload_gallery
+    if 'log' in journal: return
+    srv = authenticate_drive()
+    if not srv: raise RuntimeError("Drive service unavailable")
+    confirmed = datetime.strptime(p['timestamp'], "%Y-%m-%d %H:%M:%S")
+    folder = journal.get('folder')
+    if folder:
+        get_folder_cache().put_order(p['order_id'], folder['id'], folder['name'], confirmed.strftime("%d-%m-%Y"))
+    else:
+        with metrics.span("stage.folder_structure", order_id=p['order_id']):
+            fid, name = get_target_folder_structure(srv, p['order_id'], MAIN_FOLDER_ID, now=confirmed, reuse=retry)
+        folder = journal.put('folder', {'id': fid, 'name': name})
+    fid = folder['id']
+    filenames = [f"{p['order_id']}_PACKED_{p['ts']}_Img{i + 1}.jpg" for i in range(len(photos))]
+    missing = [i for i in range(len(photos)) if f"upload:{i}" not in journal]
+    if missing and retry:
+        # รูปที่ Upload ไปแล้วแต่ยังไม่ได้จด (เช่น Process ตายกลางทาง) -> หาจากชื่อไฟล์ใน Folder
+        existing = list_files(srv, fid)
+        for i in missing:
+            if filenames[i] in existing: journal.put(f"upload:{i}", existing[filenames[i]])
+        missing = [i for i in missing if f"upload:{i}" not in journal]
+    if missing:
+        with metrics.span("stage.upload_gallery", order_id=p['order_id'], photos=len(missing), of=len(photos)) as attrs:
+            up_res = upload_gallery(authenticate_drive, [photos[i] for i in missing], [filenames[i] for i in missing], fid,
+                                    on_uploaded=lambda k, file_id: journal.put(f"upload:{missing[k]}", file_id))
+            attrs['latencies'] = [round(dt, 3) for dt in up_res.latencies]
+        for dt in up_res.latencies: metrics.record("stage.upload_photo", dt, order_id=p['order_id'])  # p50/p95 ต่อรูปในหน้า Admin
+    file_ids = [journal.get(f"upload:{i}") for i in range(len(photos))]
+    # ID ของรูปสุดท้าย (ถ้าไม่มีรูปเลยให้ใส่ขีด -)
+    final_image_link_id = (file_ids[-1] if file_ids else "") or "-"
+    write_log_once(journal, LOG_SHEET_NAME, p['order_id'], p['timestamp'], lambda: save_log_to_sheet(
+        p['picker_name'], p['order_id'], p['items'], p['user_id'], final_image_link_id, timestamp=p['timestamp'], raise_errors=True))
+
+def resolve_rider_folder(service, p, outbox):
+    # Order + วันที่ที่กดยืนยัน: รอให้งานแพ็คสร้าง Folder ก่อน ถ้าไม่มีงานแพ็คค้างแล้วยังไม่เจอ -> สร้างเอง
+    confirmed = datetime.strptime(p['timestamp'], "%Y-%m-%d %H:%M:%S")
+    fid, name = find_existing_order_folder(service, p['order_id'], MAIN_FOLDER_ID, now=confirmed)
+    if not fid:
+        if outbox.open_jobs('pack_order', p['order_id']):
+            raise RuntimeError(f"Order folder for {p['order_id']} not created yet (pack job still queued)")
+        fid, name = get_target_folder_structure(service, p['order_id'], MAIN_FOLDER_ID, now=confirmed, reuse=True)
+    return {'id': fid, 'name': name}
+
+def process_rider_job(job, photos, journal):
+    p = job.payload
+    from picking.drive_upload import list_files, upload_bytes
+    with metrics.session_scope(p.get('session')), metrics.span("job.rider_photo", order_id=p['order_id'], attempt=job.attempts):
+        retry = job_started(journal)
+        if 'log' not in journal:
+            srv = authenticate_drive()
+            if not srv: raise RuntimeError("Drive service unavailable")
+            folder = journal.get('folder') or {'id': p['folder_id'], 'name': p['folder_name']}
+            if folder['id'] == PENDING_FOLDER_ID: folder = journal.put('folder', resolve_rider_folder(srv, p, journal.outbox))
+            uid = journal.get('upload:0')
+            if not uid:
+                uid = retry and list_files(srv, folder['id']).get(p['filename'])
+                if not uid:
+                    with metrics.span("stage.upload_rider_photo", order_id=p['order_id']):
+                        uid = upload_bytes(srv, photos[0], p['filename'], folder['id'])
+                journal.put('upload:0', uid)
+            write_log_once(journal, RIDER_SHEET_NAME, p['order_id'], p['timestamp'], lambda: save_rider_log(
+                p['picker_name'], p['order_id'], uid, folder['name'], timestamp=p['timestamp'], raise_errors=True))
+    record_flow("flow.rider_confirm_to_synced", p.get('confirmed_at'), session=p.get('session'))
+
+@st.cache_resource
+def get_outbox():
+    outbox = Outbox(OUTBOX_PATH)
+    OutboxWorker(outbox, {'pack_order': process_pack_job, 'rider_photo': process_rider_job}).start()
+    return outbox
+
+def render_outbox_panel():
+    outbox = get_outbox(); counts = outbox.counts()
+    pending = counts['pending'] + counts['running']
+    if not pending and not counts['failed']: return
+    st.caption(f"📤 รอส่ง: {pending} | ❌ ส่งไม่สำเร็จ: {counts['failed']}")
+    if counts['failed']:
+        with st.expander("❌ งานที่ส่งไม่สำเร็จ"):
+            for job in outbox.jobs('failed'):
+                st.write(f"**{job['payload'].get('order_id', '-')}** ({job['kind']}, {job['attempts']} ครั้ง)")
+                st.caption(job['last_error'] or "")
+                if st.button("🔁 ส่งใหม่", key=f"outbox_retry_{job['id']}"): outbox.requeue(job['id']); st.rerun()
+
+# --- METRICS ---
+def record_flow(name, started_at, session=None):
+    # เวลาตั้งแต่ started_at (time.time()) ถึงตอนนี้ เช่น สแกน Order -> กดยืนยัน
+    if started_at: metrics.record(name, time.time() - started_at, session=session)
+
+# --- WARM UP ---
+@st.cache_resource
+def warm_up():
+    # ครั้งเดียวต่อ Process หลังหน้าแรกแสดงแล้ว: import Library หนัก + โหลดชีทพนักงาน/สินค้า + เริ่ม Outbox เบื้องหลัง
+    # คนแรกที่ Login/สแกนจะไม่ต้องรอ (ปิดได้ด้วย PICKING_WARM_UP=0)
+    def run():
+        try:
+            import pandas, PIL.Image, picking.barcode, picking.drive_upload  # noqa: F401
+            get_outbox()
+            load_user_index(); load_catalog()
+        except Exception as e:
+            print(f"⚠️ Warm up: {e}")
+    if WARM_UP: threading.Thread(target=run, name="warm-up", daemon=True).start()
+    return WARM_UP
@@ -0,0 +1,73 @@
+"""Session state of the app: defaults, the safe reset between orders, logout
+and who may see the admin pages."""
+import streamlit as st
+
+from picking_app.services import ADMIN_IDS_ENV, drop_captures
+
+def init_session_state():
+    if st.session_state.get('_session_ready'): return  # ครั้งแรกของ Session เท่านั้น
+    if 'need_reset' not in st.session_state: st.session_state.need_reset = False
+    keys = ['current_user_name', 'current_user_id', 'order_val', 'prod_val', 'loc_val', 'prod_display_name', 
+            'photo_gallery', 'cam_counter', 'pick_qty', 'rider_photo', 'current_order_items', 'picking_phase', 'temp_login_user',
+            'target_rider_folder_id', 'target_rider_folder_name', 'order_started_at', 'wave'] # Added target folder vars
+    for k in keys:
+        if k not in st.session_state:
+            if k == 'pick_qty': st.session_state[k] = 1
+            elif k == 'cam_counter': st.session_state[k] = 0
+            elif k == 'photo_gallery': st.session_state[k] = []
+            elif k == 'current_order_items': st.session_state[k] = []
+            elif k == 'picking_phase': st.session_state[k] = 'scan'
+            elif k == 'order_started_at': st.session_state[k] = 0.0
+            else: st.session_state[k] = None if k in ['temp_login_user', 'target_rider_folder_id', 'wave'] else ""
+    st.session_state._session_ready = True
+
+# --- SAFE RESET SYSTEM ---
+def trigger_reset():
+    st.session_state.need_reset = True
+
+def check_and_execute_reset():
+    if st.session_state.get('need_reset'):
+        # Reset Widgets
+        if 'pack_order_man' in st.session_state: st.session_state.pack_order_man = ""
+        if 'rider_ord_man' in st.session_state: st.session_state.rider_ord_man = ""
+        if 'pack_prod_man' in st.session_state: st.session_state.pack_prod_man = ""
+        if 'loc_man' in st.session_state: st.session_state.loc_man = ""
+        
+        # Reset State Variables
+        st.session_state.order_val = ""
+        st.session_state.order_started_at = 0.0
+        st.session_state.current_order_items = []
+        drop_captures(*st.session_state.photo_gallery, st.session_state.rider_photo)
+        st.session_state.photo_gallery = [] 
+        st.session_state.rider_photo = None
+        st.session_state.picking_phase = 'scan'
+        st.session_state.temp_login_user = None
+        
+        # --- NEW: Clear Target Folder State to avoid stale data ---
+        st.session_state.target_rider_folder_id = None
+        st.session_state.target_rider_folder_name = ""
+        
+        # Reset Helpers
+        st.session_state.prod_val = ""
+        st.session_state.loc_val = ""
+        st.session_state.prod_display_name = ""
+        st.session_state.pick_qty = 1 
+        st.session_state.cam_counter += 1
+        
+        st.session_state.need_reset = False
+
+def logout_user():
+    st.session_state.current_user_name = ""
+    st.session_state.current_user_id = ""
+    st.session_state.wave = None
+    trigger_reset()
+    st.rerun()
+
+def get_admin_ids():
+    ids = {x.strip() for x in ADMIN_IDS_ENV.split(',') if x.strip()}
+    try: ids.update(str(x) for x in st.secrets.get("admin_ids", []))
+    except Exception: pass
+    return ids
+
+def is_admin():
+    return bool(st.session_state.current_user_id) and st.session_state.current_user_id in get_admin_ids()
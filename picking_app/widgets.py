@@ -0,0 +1,33 @@
+"""Scan inputs shared by the pages (typed value or back camera + barcode decode)."""
+import streamlit as st
+from streamlit_back_camera_input import back_camera_input
+
+from picking_app.services import get_scan_log, get_thai_time
+
+
+def decode_text(file_obj, field=None):
+    from picking.barcode import decode_text as decode  # pyzbar / PIL โหลดเมื่อสแกนครั้งแรก
+    return decode(file_obj, field)
+
+def location_matches(catalog, scanned, barcode):
+    # เทียบรหัสมาตรฐาน (Zone-Location หรือ Location อย่างเดียว) จาก Index ที่สร้างครั้งเดียวต่อ Catalog ไม่รับรหัสบางส่วนเช่น "A"
+    return catalog.location_index().matches(scanned, barcode)
+
+def check_location(catalog, scanned, barcode):
+    # เหมือน location_matches แต่บันทึกผลการสแกนไว้ทำสถิติ (ครั้งเดียวต่อการสแกน ไม่ใช่ทุก Rerun)
+    ok = location_matches(catalog, scanned, barcode)
+    event = (st.session_state.cam_counter, barcode, scanned)
+    if st.session_state.get('last_scan_event') != event:
+        st.session_state.last_scan_event = event
+        target = catalog.location_index().target(barcode) or ""
+        try: get_scan_log().record(target, scanned, ok, st.session_state.current_user_name, barcode, ts=get_thai_time())
+        except OSError as e: print(f"⚠️ Scan log: {e}")
+    return ok
+
+def scan_input(label, man_key, cam_key, field, upper=True):
+    # ช่องพิมพ์ + กล้อง (เหมือนหน้าแพ็ค) คืนค่าที่ได้หรือ None
+    manual = st.text_input(f"พิมพ์ {label}", key=man_key).strip()
+    if manual: return manual.upper() if upper else manual
+    scan = back_camera_input(f"แตะเพื่อสแกน {label}", key=cam_key)
+    res = decode_text(scan, field) if scan else None
+    return (res.upper() if upper else res) if res else None